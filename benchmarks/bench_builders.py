@@ -0,0 +1,120 @@
+"""
+Micro-benchmark of the columnar, typed DataFrame builders against the former row-at-a-time builders.
+
+Runs offline on synthetic mempool snapshots:
+
+    python benchmarks/bench_builders.py --txs 5000 --repeat 5
+"""
+import argparse
+import importlib.util
+import os
+import random
+import timeit
+
+import pandas as pd
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Load the builders module directly so that the benchmark does not need MindsDB installed
+_spec = importlib.util.spec_from_file_location('blockchain_columns', os.path.join(PACKAGE_DIR, 'blockchain_columns.py'))
+blockchain_columns = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(blockchain_columns)
+
+INT, FLOAT, STRING = blockchain_columns.INT, blockchain_columns.FLOAT, blockchain_columns.STRING
+SCHEMA = {
+    'hash': STRING, 'size': INT, 'time': INT, 'fee': INT, 'inputs_count': INT, 'outputs_count': INT,
+    'total_input_value': INT, 'total_output_value': INT, 'fee_per_byte': FLOAT
+}
+
+
+def make_transactions(n_txs: int, seed: int = 42) -> list:
+    """Generate raw transactions shaped like /unconfirmed-transactions entries."""
+    rng = random.Random(seed)
+    txs = []
+    for i in range(n_txs):
+        inputs = [
+            {'prev_out': {'value': rng.randint(546, 10 ** 9), 'n': j}, 'sequence': 4294967295}
+            for j in range(rng.randint(1, 8))
+        ]
+        outputs = [{'value': rng.randint(546, 10 ** 9), 'n': j} for j in range(rng.randint(1, 6))]
+        txs.append({
+            'hash': f'{i:064x}',
+            'size': rng.randint(150, 2000),
+            'time': 1700000000 + i,
+            'fee': rng.randint(0, 100000),
+            'inputs': inputs,
+            'out': outputs
+        })
+    return txs
+
+
+def build_rows(txs: list) -> pd.DataFrame:
+    """The former row-at-a-time builder of UnconfirmedTransactionsTable."""
+    rows = []
+    for tx in txs:
+        inputs = tx.get('inputs', [])
+        outputs = tx.get('out', [])
+
+        total_input = sum(float(inp.get('prev_out', {}).get('value', 0)) for inp in inputs if inp.get('prev_out'))
+        total_output = sum(float(out.get('value', 0)) for out in outputs)
+
+        fee = tx.get('fee', 0)
+        size = tx.get('size', 1)
+        fee_per_byte = fee / size if size > 0 else 0
+
+        rows.append([
+            tx.get('hash'),
+            tx.get('size'),
+            tx.get('time'),
+            fee,
+            len(inputs),
+            len(outputs),
+            total_input,
+            total_output,
+            fee_per_byte
+        ])
+    return pd.DataFrame(rows, columns=list(SCHEMA))
+
+
+def build_columns(txs: list) -> pd.DataFrame:
+    """The columnar builder used by UnconfirmedTransactionsTable."""
+    aggregates = blockchain_columns.transaction_aggregates(txs)
+    return blockchain_columns.build_frame(txs, SCHEMA, computed={
+        'inputs_count': aggregates['inputs_count'],
+        'outputs_count': aggregates['outputs_count'],
+        'total_input_value': aggregates['total_input'],
+        'total_output_value': aggregates['total_output'],
+        'fee_per_byte': blockchain_columns.fee_rates(txs)
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--txs', type=int, default=5000, help='transactions per snapshot')
+    parser.add_argument('--repeat', type=int, default=5, help='timing repetitions, the best one is reported')
+    args = parser.parse_args()
+
+    txs = make_transactions(args.txs)
+
+    # Both builders must agree before their timings mean anything
+    rows_df = build_rows(txs)
+    columns_df = build_columns(txs)
+    for column in ('total_input_value', 'total_output_value', 'inputs_count', 'outputs_count'):
+        assert (rows_df[column].astype('int64') == columns_df[column].astype('int64')).all(), column
+
+    rows_time = min(timeit.repeat(lambda: build_rows(txs), number=1, repeat=args.repeat))
+    columns_time = min(timeit.repeat(lambda: build_columns(txs), number=1, repeat=args.repeat))
+
+    print(f"{args.txs} transactions, best of {args.repeat}")
+    print(f"  row builder:      {rows_time * 1000:9.2f} ms")
+    print(f"  columnar builder: {columns_time * 1000:9.2f} ms")
+    print(f"  speedup:          {rows_time / columns_time:9.2f}x")
+
+    rows_memory = rows_df.memory_usage(deep=True).sum()
+    columns_memory = columns_df.memory_usage(deep=True).sum()
+    print(f"  row result:       {rows_memory / 1024:9.0f} KB")
+    print(f"  typed result:     {columns_memory / 1024:9.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
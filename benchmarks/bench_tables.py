@@ -0,0 +1,205 @@
+"""
+End-to-end benchmark of every table's select() path against the local API stand-in.
+
+Starts benchmarks/standin_server.py on a free port, points `base_url` and `charts_base_url`
+of a BlockchainHandler at it and runs each scenario query several times, reporting latency
+percentiles, throughput, peak traced memory and the API requests per endpoint. No network
+access is needed, so it can run in CI:
+
+    python benchmarks/bench_tables.py --runs 10 --latency-ms 50 --throttle-rate 0.05
+    python benchmarks/bench_tables.py --scenario blocks_range --json results.json
+
+The handler package must be importable with MindsDB installed. By default the directory
+containing this repository is put on sys.path and the package is imported by its directory
+name; use --handler-module for an installed handler instead.
+"""
+import argparse
+import importlib
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import List, Dict, Optional
+
+from standin_server import StandInServer, add_server_arguments, server_from_arguments
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def scenarios(chain) -> Dict[str, str]:
+    """Scenario name to SQL query, covering the select() path of every table."""
+    tip = chain.tip_height
+    block_hashes = ', '.join(f"'{chain.block_hash(tip - 10 - i)}'" for i in range(10))
+    tx_hashes = ', '.join(f"'{i:064x}'" for i in range(20))
+    addresses = ', '.join(f"'{chain.address(i)}'" for i in range(20))
+    # Overlaps addresses_multi and repeats some addresses, as generated monitoring lists do
+    bulk_addresses = ', '.join(f"'{chain.address(i % 1500)}'" for i in range(2000))
+    return {
+        'blocks_latest': 'SELECT * FROM blocks',
+        'blocks_range': f'SELECT height, hash, time, n_tx FROM blocks WHERE height BETWEEN {tip - 99} AND {tip}',
+        'blocks_hashes': f'SELECT * FROM blocks WHERE hash IN ({block_hashes})',
+        'transactions_hashes': f'SELECT * FROM transactions WHERE hash IN ({tx_hashes})',
+        'transactions_mempool': 'SELECT hash, fee, size FROM transactions LIMIT 100',
+        'addresses_single': f"SELECT * FROM addresses WHERE address = '{chain.address(0)}'",
+        'addresses_multi': f'SELECT * FROM addresses WHERE address IN ({addresses})',
+        'addresses_bulk': f'SELECT address, final_balance FROM addresses WHERE address IN ({bulk_addresses})',
+        'address_transactions': f"SELECT * FROM address_transactions WHERE address = '{chain.address(1)}' LIMIT 200",
+        'charts': (
+            f"SELECT * FROM charts WHERE chart_type = 'market-price' "
+            f"AND timestamp >= {chain.block_time(tip) - 90 * 86400}"
+        ),
+        'blocks_time_range': (
+            f'SELECT height, hash, time FROM blocks '
+            f'WHERE time >= {chain.block_time(tip) - 30 * 86400} AND time <= {chain.block_time(tip)}'
+        ),
+        'block_transactions_hash': f"SELECT * FROM block_transactions WHERE block_hash = '{chain.block_hash(tip - 10)}'",
+        'block_transactions_range': (
+            f'SELECT block_height, hash, fee, total_output FROM block_transactions '
+            f'WHERE block_height BETWEEN {tip - 19} AND {tip}'
+        ),
+        'block_transactions_limit': f'SELECT * FROM block_transactions WHERE block_height >= {tip - 999} LIMIT 100',
+        'stats': 'SELECT * FROM stats',
+        'unconfirmed_transactions': 'SELECT * FROM unconfirmed_transactions ORDER BY fee_per_byte DESC LIMIT 50',
+        'mempool_fee_histogram': 'SELECT * FROM mempool_fee_histogram'
+    }
+
+
+def load_handler_class(module_name: Optional[str]):
+    if module_name is None:
+        sys.path.insert(0, os.path.dirname(PACKAGE_DIR))
+        module_name = os.path.basename(PACKAGE_DIR) + '.blockchain_handler'
+    return importlib.import_module(module_name).BlockchainHandler
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    position = min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[position]
+
+
+def run_query(handler, sql: str) -> int:
+    """Run a query through the handler and return the number of rows."""
+    response = handler.native_query(sql)
+    if getattr(response, 'error_message', None):
+        raise RuntimeError(response.error_message)
+    return len(response.data_frame) if response.data_frame is not None else 0
+
+
+def bench_scenario(handler_class, connection_data: Dict, server: StandInServer, sql: str,
+                   runs: int, warm: bool) -> Dict:
+    """
+    Time a query over several runs.
+
+    Cold runs use a new handler each time, so that nothing is served from its caches.
+    Peak memory is measured on one extra traced run, since tracing slows everything down.
+    """
+    def new_handler():
+        return handler_class('blockchain_bench', connection_data=connection_data)
+
+    handler = new_handler()
+    if warm:
+        run_query(handler, sql)
+
+    server.reset_counters()
+    latencies = []
+    rows = 0
+    started = time.perf_counter()
+    for _ in range(runs):
+        if not warm:
+            handler.disconnect()
+            handler = new_handler()
+        query_started = time.perf_counter()
+        rows = run_query(handler, sql)
+        latencies.append(time.perf_counter() - query_started)
+    elapsed = time.perf_counter() - started
+    if not rows:
+        # Every scenario selects existing data, so an empty result means the timings measure nothing
+        raise RuntimeError("query returned no rows")
+    requests = dict(server.requests)
+    throttled = sum(server.throttled.values())
+    bytes_sent = server.bytes_sent
+
+    if not warm:
+        handler.disconnect()
+        handler = new_handler()
+    tracemalloc.start()
+    try:
+        run_query(handler, sql)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        handler.disconnect()
+
+    return {
+        'rows': rows,
+        'runs': runs,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p90_ms': percentile(latencies, 90) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'queries_per_s': runs / elapsed if elapsed else 0.0,
+        'peak_mb': peak / (1024 * 1024),
+        'requests_per_run': {endpoint: count / runs for endpoint, count in sorted(requests.items())},
+        'throttled_per_run': throttled / runs,
+        'kb_per_run': bytes_sent / runs / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='timed runs per scenario')
+    parser.add_argument('--scenario', action='append', help='run only the given scenarios, can be repeated')
+    parser.add_argument('--warm', action='store_true', help='reuse one handler so that its caches are warm')
+    parser.add_argument('--engine', choices=('async', 'threads'), default='async', help='fan-out engine of the handler')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='rate_limit of the handler, 0 disables it')
+    parser.add_argument('--handler-module', default=None, help='module of an installed handler to benchmark')
+    parser.add_argument('--json', dest='json_path', default=None, help='also write the results to this file')
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    handler_class = load_handler_class(args.handler_module)
+
+    with server_from_arguments(args) as server:
+        connection_data = {
+            'base_url': server.url,
+            'charts_base_url': server.url,
+            'rate_limit': args.rate_limit,
+            'async_engine': args.engine == 'async'
+        }
+        queries = scenarios(server.chain)
+        names = args.scenario or list(queries)
+        unknown = set(names) - set(queries)
+        if unknown:
+            parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}, choose from {', '.join(queries)}")
+
+        results = {}
+        print(f"{args.runs} {'warm' if args.warm else 'cold'} runs per scenario, "
+              f"{args.latency_ms:.0f}+{args.jitter_ms:.0f} ms latency, {args.throttle_rate:.0%} throttled, "
+              f"{args.engine} engine")
+        print(f"{'scenario':<26}{'rows':>6}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'q/s':>8}"
+              f"{'peak MB':>9}{'429s':>6}  requests per run")
+        for name in names:
+            try:
+                result = bench_scenario(handler_class, connection_data, server, queries[name], args.runs, args.warm)
+            except Exception as e:
+                results[name] = {'error': str(e)}
+                print(f"{name:<26}failed: {e}")
+                continue
+            results[name] = result
+            requests = ', '.join(f"{endpoint} {count:g}" for endpoint, count in result['requests_per_run'].items())
+            print(f"{name:<26}{result['rows']:>6}{result['p50_ms']:>10.1f}{result['p90_ms']:>10.1f}"
+                  f"{result['p99_ms']:>10.1f}{result['queries_per_s']:>8.2f}{result['peak_mb']:>9.1f}"
+                  f"{result['throttled_per_run']:>6g}  {requests}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'settings': vars(args), 'results': results}, f, indent=2)
+
+    if any('error' in result for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,462 @@
+"""
+Local stand-in for the blockchain.info and api.blockchain.info APIs.
+
+Serves deterministic synthetic fixtures shaped like the live responses, or recorded
+responses from a fixtures directory, with configurable latency, throttling and payload
+sizes. Used by the offline benchmarks, it can also be started on its own:
+
+    python benchmarks/standin_server.py --port 8765 --latency-ms 50 --throttle-rate 0.05
+
+A recorded response for an endpoint is read from `<fixtures_dir><endpoint>.json`, e.g.
+`fixtures/rawblock/<hash>.json` or `fixtures/stats.json`, and served instead of the
+synthetic one when present.
+"""
+import argparse
+import calendar
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+GENESIS_TIME = 1231006505
+BLOCK_INTERVAL = 600
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256('/'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+class FixtureChain:
+    """
+    Deterministic synthetic chain: every block, transaction and address is derived from
+    its height or index, so the same request always yields the same response.
+    """
+
+    def __init__(self, tip_height: int = 800000, txs_per_block: int = 50, address_txs: int = 500,
+                 mempool_size: int = 2000, chart_days: int = 365, seed: int = 42):
+        """
+        Args:
+            tip_height (int): Height of the latest block
+            txs_per_block (int): Transactions per block, which drives the /rawblock payload size
+            address_txs (int): Length of every address history
+            mempool_size (int): Transactions in the /unconfirmed-transactions snapshot
+            chart_days (int): Days of daily points per chart
+            seed (int): Seed of the random fields
+        """
+        self.tip_height = tip_height
+        self.txs_per_block = txs_per_block
+        self.address_txs = address_txs
+        self.mempool_size = mempool_size
+        self.chart_days = chart_days
+        self.seed = seed
+        self._heights_by_hash: Optional[Dict[str, int]] = None
+
+    def block_hash(self, height: int) -> str:
+        # Displayed block hashes start with zero bytes
+        return '0000000000000000' + _digest('block', self.seed, height)[16:]
+
+    def block_time(self, height: int) -> int:
+        return GENESIS_TIME + height * BLOCK_INTERVAL
+
+    def address(self, index: int) -> str:
+        return 'bc1q' + _digest('address', self.seed, index)[:38]
+
+    def transaction(self, height: Optional[int], index: int, age: int = 0) -> Dict:
+        # Unconfirmed transactions (height None) were first seen `age` seconds ago
+        rng = random.Random(f'{self.seed}/{height}/{index}')
+        inputs = [
+            {
+                'prev_out': {'value': rng.randint(546, 10 ** 9), 'n': j, 'addr': self.address(rng.randint(0, 999))},
+                'sequence': 4294967295
+            }
+            for j in range(rng.randint(1, 4))
+        ]
+        outputs = [
+            {'value': rng.randint(546, 10 ** 9), 'n': j, 'addr': self.address(rng.randint(0, 999))}
+            for j in range(rng.randint(1, 4))
+        ]
+        size = rng.randint(150, 1500)
+        tx = {
+            'hash': _digest('tx', self.seed, height, index),
+            'ver': 2,
+            'vin_sz': len(inputs),
+            'vout_sz': len(outputs),
+            'size': size,
+            'weight': size * 4,
+            'fee': rng.randint(0, 100000),
+            'relayed_by': '0.0.0.0',
+            'lock_time': 0,
+            'tx_index': (height or 0) * 10000 + index,
+            'double_spend': False,
+            'time': self.block_time(height) if height is not None else int(time.time()) - age,
+            'block_index': height,
+            'block_height': height,
+            'inputs': inputs,
+            'out': outputs
+        }
+        return tx
+
+    def block(self, height: int, with_txs: bool = True) -> Dict:
+        rng = random.Random(f'{self.seed}/block/{height}')
+        txs = [self.transaction(height, i) for i in range(self.txs_per_block)] if with_txs else []
+        return {
+            'hash': self.block_hash(height),
+            'ver': 536870912,
+            'prev_block': self.block_hash(height - 1) if height > 0 else '00' * 32,
+            'mrkl_root': _digest('merkle', self.seed, height),
+            'time': self.block_time(height),
+            'bits': 386089497,
+            'next_block': [self.block_hash(height + 1)] if height < self.tip_height else [],
+            'fee': sum(tx['fee'] for tx in txs),
+            'nonce': rng.randint(0, 2 ** 32 - 1),
+            'n_tx': self.txs_per_block,
+            'size': 80 + sum(tx['size'] for tx in txs),
+            'block_index': height,
+            'main_chain': True,
+            'height': height,
+            'weight': 4 * (80 + sum(tx['size'] for tx in txs)),
+            'tx': txs
+        }
+
+    def height_of(self, block_hash: str) -> Optional[int]:
+        # Hashes can't be reversed, so only the most recent blocks are resolvable
+        if self._heights_by_hash is None:
+            heights = range(max(self.tip_height - 10000, 0), self.tip_height + 1)
+            self._heights_by_hash = {self.block_hash(height): height for height in heights}
+        return self._heights_by_hash.get(block_hash)
+
+    def latest_block(self) -> Dict:
+        return {
+            'hash': self.block_hash(self.tip_height),
+            'time': self.block_time(self.tip_height),
+            'block_index': self.tip_height,
+            'height': self.tip_height,
+            'txIndexes': list(range(self.txs_per_block))
+        }
+
+    def address_summary(self, address: str) -> Dict:
+        rng = random.Random(f'{self.seed}/{address}')
+        received = rng.randint(0, 10 ** 11)
+        sent = rng.randint(0, received)
+        return {
+            'address': address,
+            'hash160': _digest('hash160', address)[:40],
+            'n_tx': self.address_txs,
+            'n_unredeemed': rng.randint(0, 50),
+            'total_received': received,
+            'total_sent': sent,
+            'final_balance': received - sent
+        }
+
+    def address_history(self, address: str, offset: int, limit: int) -> Dict:
+        summary = self.address_summary(address)
+        txs = []
+        for position in range(offset, min(offset + limit, self.address_txs)):
+            # Newest first, one transaction every few blocks
+            height = self.tip_height - position * 3
+            tx = self.transaction(height, position % max(self.txs_per_block, 1))
+            tx['result'] = tx['out'][0]['value'] - tx['fee']
+            tx['balance'] = summary['final_balance']
+            txs.append(tx)
+        summary['txs'] = txs
+        return summary
+
+    def blocks_of_day(self, day_ms: int) -> Dict:
+        day_start = (day_ms // 1000) // 86400 * 86400
+        first = max((day_start - GENESIS_TIME + BLOCK_INTERVAL - 1) // BLOCK_INTERVAL, 0)
+        last = min((day_start + 86400 - 1 - GENESIS_TIME) // BLOCK_INTERVAL, self.tip_height)
+        return {
+            'blocks': [
+                {
+                    'hash': self.block_hash(height),
+                    'height': height,
+                    'time': self.block_time(height),
+                    'block_index': height
+                }
+                for height in range(first, last + 1)
+            ]
+        }
+
+    def chart(self, chart_type: str, params: Dict[str, str]) -> Dict:
+        now = self.block_time(self.tip_height) // 86400 * 86400
+        start = now - (self.chart_days - 1) * 86400
+        if params.get('start'):
+            start = max(start, calendar.timegm(time.strptime(params['start'], '%Y-%m-%d')))
+        end = now
+        timespan = params.get('timespan', '')
+        if timespan.endswith('days') and timespan[:-4].isdigit():
+            end = min(now, start + (int(timespan[:-4]) - 1) * 86400)
+        rng = random.Random(f'{self.seed}/{chart_type}')
+        base = rng.uniform(1, 100000)
+        values = [
+            {'x': x, 'y': round(base * (1 + 0.1 * random.Random(f'{chart_type}/{x}').random()), 2)}
+            for x in range(start, end + 1, 86400)
+        ]
+        return {
+            'status': 'ok',
+            'name': chart_type,
+            'unit': 'USD',
+            'period': 'day',
+            'description': f'Synthetic {chart_type} series',
+            'values': values
+        }
+
+    def stats(self) -> Dict:
+        return {
+            'market_price_usd': 65000.0,
+            'hash_rate': 6.5e11,
+            'total_fees_btc': 1200000000,
+            'n_btc_mined': 90000000000,
+            'n_tx': 400000,
+            'n_blocks_mined': 144,
+            'minutes_between_blocks': 10.0,
+            'totalbc': 1970000000000000,
+            'n_blocks_total': self.tip_height,
+            'estimated_transaction_volume_usd': 2.5e9,
+            'blocks_size': 230000000,
+            'miners_revenue_usd': 4.5e7,
+            'nextretarget': (self.tip_height // 2016 + 1) * 2016,
+            'difficulty': 8.8e13,
+            'estimated_btc_sent': 50000000000000,
+            'miners_revenue_btc': 700,
+            'total_btc_sent': 150000000000000,
+            'trade_volume_btc': 20000.0,
+            'trade_volume_usd': 1.3e9,
+            'timestamp': int(time.time() * 1000)
+        }
+
+    def unconfirmed_transactions(self) -> Dict:
+        # The snapshot rotates slowly so that repeated refreshes see churn, newest transactions first
+        generation = int(time.time()) // 10
+        return {
+            'txs': [self.transaction(None, generation * 100 + i, age=i) for i in range(self.mempool_size)]
+        }
+
+
+class StandInServer:
+    """
+    Threaded HTTP server answering both API hosts from a FixtureChain.
+
+    Requests are counted per endpoint family. Every request is delayed by the configured
+    latency, and a configurable share of requests is answered with 429 and Retry-After.
+    """
+
+    def __init__(self, chain: Optional[FixtureChain] = None, host: str = '127.0.0.1', port: int = 0,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, throttle_rate: float = 0.0,
+                 retry_after: float = 0.0, fixtures_dir: Optional[str] = None, seed: int = 42):
+        """
+        Args:
+            chain (FixtureChain): Source of synthetic responses
+            host (str): Interface to listen on
+            port (int): Port to listen on, 0 picks a free one
+            latency_ms (float): Delay added to every response
+            jitter_ms (float): Maximum random delay added on top of latency_ms
+            throttle_rate (float): Share of requests answered with 429, from 0 to 1
+            retry_after (float): Retry-After seconds sent with 429 responses, 0 omits the header
+            fixtures_dir (str): Directory of recorded responses served instead of synthetic ones
+            seed (int): Seed of the latency jitter and the throttling
+        """
+        self.chain = chain or FixtureChain()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.fixtures_dir = fixtures_dir
+
+        self.requests = Counter()
+        self.throttled = Counter()
+        self.bytes_sent = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self._server = ThreadingHTTPServer((host, port), self._make_request_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'StandInServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='standin_server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'StandInServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.throttled.clear()
+            self.bytes_sent = 0
+
+    @staticmethod
+    def endpoint_family(path: str) -> str:
+        """Group request paths by endpoint, e.g. /rawblock/<hash> -> /rawblock."""
+        if path.startswith('/charts/'):
+            return '/charts/*'
+        parts = path.split('/')
+        return '/' + parts[1] if len(parts) > 1 else path
+
+    def _delay(self) -> Tuple[float, bool]:
+        with self._lock:
+            jitter = self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+            throttle = self.throttle_rate > 0 and self._rng.random() < self.throttle_rate
+        return (self.latency_ms + jitter) / 1000, throttle
+
+    def _recorded(self, path: str) -> Optional[bytes]:
+        if not self.fixtures_dir:
+            return None
+        root = os.path.abspath(self.fixtures_dir)
+        file_path = os.path.abspath(os.path.join(root, path.strip('/') + '.json'))
+        if not file_path.startswith(root + os.sep) or not os.path.isfile(file_path):
+            return None
+        with open(file_path, 'rb') as f:
+            return f.read()
+
+    def respond(self, path: str, params: Dict[str, str]) -> Tuple[int, Optional[Dict]]:
+        """Status code and payload for a request."""
+        chain = self.chain
+        parts = path.strip('/').split('/')
+        endpoint, arg = parts[0], parts[1] if len(parts) > 1 else None
+
+        if endpoint == 'latestblock':
+            return 200, chain.latest_block()
+        if endpoint == 'block-height' and arg is not None and arg.isdigit():
+            height = int(arg)
+            if height > chain.tip_height:
+                return 404, {'error': 'not-found'}
+            # Like the live API, block-height responses carry the full blocks
+            return 200, {'blocks': [chain.block(height)]}
+        if endpoint == 'rawblock' and arg:
+            height = int(arg) if arg.isdigit() else chain.height_of(arg)
+            if height is None or height > chain.tip_height:
+                return 404, {'error': 'not-found'}
+            return 200, chain.block(height)
+        if endpoint == 'rawtx' and arg:
+            # Transaction hashes encode nothing, so any hash resolves to a transaction of the tip
+            tx = chain.transaction(chain.tip_height, int(arg[:4], 16) % max(chain.txs_per_block, 1))
+            tx['hash'] = arg
+            return 200, tx
+        if endpoint == 'rawaddr' and arg:
+            offset = int(params.get('offset', 0))
+            limit = min(int(params.get('limit', 50)), 50)
+            return 200, chain.address_history(arg, offset, limit)
+        if endpoint == 'multiaddr':
+            addresses = [address for address in params.get('active', '').split('|') if address]
+            # Like the API, /multiaddr leaves out n_unredeemed
+            summaries = [
+                {key: value for key, value in chain.address_summary(address).items() if key != 'n_unredeemed'}
+                for address in dict.fromkeys(addresses)
+            ]
+            return 200, {'addresses': summaries, 'txs': []}
+        if endpoint == 'blocks' and arg and arg.isdigit():
+            return 200, chain.blocks_of_day(int(arg))
+        if endpoint == 'charts' and arg:
+            return 200, chain.chart(arg, params)
+        if endpoint == 'stats':
+            return 200, chain.stats()
+        if endpoint == 'unconfirmed-transactions':
+            return 200, chain.unconfirmed_transactions()
+        return 404, {'error': 'not-found'}
+
+    def _make_request_handler(self):
+        server = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                family = server.endpoint_family(url.path)
+
+                delay, throttle = server._delay()
+                if delay:
+                    time.sleep(delay)
+
+                with server._lock:
+                    server.requests[family] += 1
+                    if throttle:
+                        server.throttled[family] += 1
+
+                if throttle:
+                    status, body = 429, b'{"error": "rate limited"}'
+                else:
+                    body = server._recorded(url.path)
+                    status = 200
+                    if body is None:
+                        status, payload = server.respond(url.path, params)
+                        body = json.dumps(payload, separators=(',', ':')).encode()
+
+                with server._lock:
+                    server.bytes_sent += len(body)
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                if status == 429 and server.retry_after:
+                    self.send_header('Retry-After', str(server.retry_after))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return RequestHandler
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    """Command line options shared by the stand-in server and the benchmarks using it."""
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='delay added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=10.0, help='maximum random delay on top of --latency-ms')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of requests answered with 429')
+    parser.add_argument('--retry-after', type=float, default=0.0, help='Retry-After seconds sent with 429 responses')
+    parser.add_argument('--txs-per-block', type=int, default=50, help='transactions per block in /rawblock')
+    parser.add_argument('--address-txs', type=int, default=500, help='length of every address history')
+    parser.add_argument('--mempool-size', type=int, default=2000, help='transactions per mempool snapshot')
+    parser.add_argument('--fixtures-dir', default=None, help='directory of recorded responses')
+
+
+def server_from_arguments(args: argparse.Namespace, port: int = 0) -> StandInServer:
+    chain = FixtureChain(txs_per_block=args.txs_per_block, address_txs=args.address_txs, mempool_size=args.mempool_size)
+    return StandInServer(
+        chain,
+        port=port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        fixtures_dir=args.fixtures_dir
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = server_from_arguments(args, port=args.port)
+    print(f'Serving the blockchain.info stand-in on {server.url}')
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
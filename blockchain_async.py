@@ -0,0 +1,267 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, Awaitable, Callable, FrozenSet, Tuple
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from mindsdb.utilities import log
+
+from .blockchain_deadline import Deadline, DeadlineExceeded, check_deadline, current_deadline
+from .blockchain_decode import STREAM_CHUNK_SIZE, field_decoder, loads
+from .blockchain_metrics import HandlerMetrics
+from .blockchain_transport import (
+    RETRY_STATUS_CODES,
+    CircuitBreaker,
+    CircuitOpenError,
+    TokenBucketRateLimiter,
+    backoff_delay,
+    parse_retry_after
+)
+
+logger = log.getLogger(__name__)
+
+
+def is_available() -> bool:
+    """Whether the async engine can be used, i.e. aiohttp is installed."""
+    return aiohttp is not None
+
+
+class AsyncBlockchainClient:
+    """
+    Asyncio client for the Blockchain.com APIs, driven from synchronous code.
+
+    An event loop runs on a dedicated background thread and owns one pooled aiohttp
+    session per base URL. Callers submit coroutines through `submit` or `run`, so many
+    requests overlap their network waits on a single thread. The number of requests in
+    flight is bounded by a semaphore and every request still goes through the shared
+    rate limiter and circuit breakers, with the same retry policy and deadline handling
+    as BlockchainTransport. Tasks inherit the deadline of the thread that submitted them.
+    """
+
+    def __init__(
+        self,
+        headers: Dict[str, str],
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        concurrency: int = 32,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        metrics: Optional[HandlerMetrics] = None,
+        breaker_for: Optional[Callable[[str], CircuitBreaker]] = None
+    ):
+        if aiohttp is None:
+            raise ImportError("The async engine requires aiohttp, install it with `pip install aiohttp`")
+
+        self.headers = headers
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        # Circuit breaker per base URL, e.g. BlockchainTransport.breaker so that both engines share them
+        self.breaker_for = breaker_for
+
+        # Only touched from the event loop thread
+        self._sessions: Dict[str, 'aiohttp.ClientSession'] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='blockchain_handler_async', daemon=True)
+        self._thread.start()
+
+    def submit(self, coro: Awaitable) -> Future:
+        """
+        Schedule a coroutine on the event loop.
+
+        Returns:
+            concurrent.futures.Future resolving to the result of the coroutine
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro: Awaitable) -> Any:
+        """Run a coroutine on the event loop and block until it completes."""
+        return self.submit(coro).result()
+
+    def _get_session(self, base_url: str) -> 'aiohttp.ClientSession':
+        session = self._sessions.get(base_url)
+        if session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+            timeout = aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.read_timeout)
+            session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=connector,
+                timeout=timeout,
+                raise_for_status=False
+            )
+            self._sessions[base_url] = session
+        return session
+
+    async def _acquire(self, deadline: Optional[Deadline], endpoint: str) -> None:
+        if self.rate_limiter is None:
+            return
+        waited = 0.0
+        delay = self.rate_limiter.try_acquire()
+        while delay > 0:
+            if deadline is not None and delay >= deadline.remaining():
+                deadline.fail(f'waiting for the rate limiter before requesting {endpoint}')
+            await asyncio.sleep(delay)
+            waited += delay
+            delay = self.rate_limiter.try_acquire()
+        if self.metrics is not None:
+            self.metrics.record_rate_limit_wait(waited)
+
+    def _timeout(self, deadline: Optional[Deadline]) -> Dict[str, 'aiohttp.ClientTimeout']:
+        # Timeout arguments of a request, capped by the remaining budget of the query. Without
+        # a deadline none are passed, as timeout=None would also drop the session's timeouts.
+        if deadline is None:
+            return {}
+        remaining = max(deadline.remaining(), 0.01)
+        return {'timeout': aiohttp.ClientTimeout(
+            total=remaining,
+            sock_connect=min(self.connect_timeout, remaining),
+            sock_read=min(self.read_timeout, remaining)
+        )}
+
+    async def get_json(
+        self,
+        base_url: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        fields: Optional[FrozenSet[str]] = None
+    ) -> Tuple[Any, int]:
+        """
+        Send a GET request, retrying on throttling, transient errors and timeouts.
+
+        Args:
+            base_url (str): Scheme and host of the API
+            endpoint (str): API endpoint path
+            params (dict): Optional query parameters
+            fields (frozenset): Only decode these top-level fields, streaming the response and
+                closing it once they are read
+
+        Returns:
+            Tuple of the decoded JSON response and the size of the raw payload in bytes
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        session = self._get_session(base_url)
+        breaker = self.breaker_for(base_url) if self.breaker_for is not None else None
+        deadline = current_deadline()
+        url = base_url + endpoint
+        # aiohttp only accepts str, int and float query values
+        params = {key: str(value).lower() if isinstance(value, bool) else value for key, value in (params or {}).items()}
+
+        started = time.perf_counter()
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                check_deadline(f'before requesting {endpoint}')
+                if breaker is not None and not breaker.allow():
+                    raise CircuitOpenError(
+                        f"Circuit for {base_url} is open after repeated failures, "
+                        f"next attempt in {breaker.retry_in():.0f}s"
+                    )
+                await self._acquire(deadline, endpoint)
+
+                try:
+                    async with session.get(url, params=params, **self._timeout(deadline)) as response:
+                        # Throttling and client errors still show that the API is up
+                        if breaker is not None:
+                            if response.status >= 500:
+                                breaker.record_failure()
+                            else:
+                                breaker.record_success()
+                        if response.status in RETRY_STATUS_CODES and attempt < self.max_retries:
+                            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                            delay = retry_after if retry_after is not None else self._backoff(attempt)
+                            delay = min(delay, self.max_backoff)
+                            if response.status == 429 and self.rate_limiter is not None:
+                                self.rate_limiter.penalize(delay)
+                            if deadline is not None and delay >= deadline.remaining():
+                                deadline.fail(f'retrying {endpoint}')
+                            if self.metrics is not None:
+                                self.metrics.record_retry(endpoint, str(response.status))
+                            logger.warning(f"Request to {endpoint} returned {response.status}, retrying in {delay:.2f}s")
+                        else:
+                            response.raise_for_status()
+                            if self.rate_limiter is not None:
+                                self.rate_limiter.reward()
+                            if fields is None:
+                                body = await response.read()
+                                decode_started = time.perf_counter()
+                                data, size = loads(body), len(body)
+                                decode_time = time.perf_counter() - decode_started
+                            else:
+                                data, size, decode_time = await self._read_fields(response, endpoint, fields)
+                            if self.metrics is not None:
+                                self.metrics.record_request(
+                                    endpoint, time.perf_counter() - started - decode_time, size, decode_time
+                                )
+                            return data, size
+                except DeadlineExceeded:
+                    raise
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    if deadline is not None and deadline.expired:
+                        # The timeout was cut short by the budget, which says nothing about the API
+                        deadline.fail(f'requesting {endpoint}')
+                    if breaker is not None:
+                        breaker.record_failure()
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = self._backoff(attempt)
+                    if deadline is not None and delay >= deadline.remaining():
+                        deadline.fail(f'retrying {endpoint}')
+                    if self.metrics is not None:
+                        self.metrics.record_retry(endpoint, type(e).__name__)
+                    logger.warning(f"Request to {endpoint} failed ({e!r}), retrying in {delay:.2f}s")
+
+                await asyncio.sleep(delay)
+
+        # Unreachable: the last attempt either returns or raises
+        raise RuntimeError(f"Retries exhausted for {url}")
+
+    @staticmethod
+    async def _read_fields(
+        response: 'aiohttp.ClientResponse',
+        endpoint: str,
+        fields: FrozenSet[str]
+    ) -> Tuple[Dict, int, float]:
+        decoder = field_decoder(endpoint, fields)
+        decode_time = 0.0
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            decode_started = time.perf_counter()
+            done = decoder.feed(chunk)
+            decode_time += time.perf_counter() - decode_started
+            if done:
+                # Leaving the response context releases the connection without reading the rest
+                response.close()
+                break
+        return decoder.finish(), decoder.bytes_read, decode_time
+
+    def _backoff(self, attempt: int) -> float:
+        return backoff_delay(attempt, self.backoff_factor, self.max_backoff)
+
+    async def _close_sessions(self) -> None:
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            await session.close()
+
+    def close(self) -> None:
+        """Close all pooled sessions and stop the event loop."""
+        if not self._loop.is_running():
+            return
+        try:
+            self.run(self._close_sessions())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
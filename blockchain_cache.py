@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable, Hashable, Tuple
+
+from .blockchain_deadline import DeadlineExceeded, current_deadline
+
+# Freshness classes for API responses
+IMMUTABLE = 'immutable'  # Confirmed blocks and transactions, cached until evicted
+NEAR_TIP = 'near_tip'    # Data that changes with every block or mempool update
+DAILY = 'daily'          # Chart series, which are updated about once a day
+
+
+class ResponseCache:
+    """
+    Thread-safe in-process cache for decoded API responses.
+
+    Entries expire according to their freshness class and the cache is bounded by
+    a byte budget, evicting the least recently used entries first.
+    """
+
+    def __init__(self, max_bytes: int, ttls: Dict[str, Optional[float]]):
+        """
+        Args:
+            max_bytes (int): Byte budget, measured on the raw response payloads
+            ttls (dict): Seconds to live per freshness class, None means no expiry
+        """
+        self.max_bytes = max_bytes
+        self.ttls = ttls
+        self.current_bytes = 0
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, int, Optional[float]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Dict] = None) -> Tuple:
+        """Build a cache key from an endpoint and its query parameters."""
+        return endpoint, tuple(sorted((params or {}).items()))
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Look up a cached value.
+
+        Returns:
+            Tuple of (hit, value)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.current_bytes -= size
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def put(self, key: Hashable, value: Any, size: int, freshness: str) -> None:
+        """
+        Store a value under the TTL of its freshness class.
+
+        Args:
+            key: Cache key, see make_key
+            value: Decoded response, shared with callers and never mutated
+            size (int): Size of the raw payload in bytes
+            freshness (str): One of IMMUTABLE, NEAR_TIP or DAILY
+        """
+        if size > self.max_bytes:
+            return
+
+        ttl = self.ttls.get(freshness)
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+            self._entries[key] = (value, size, expires_at)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _Call:
+    """An in-flight call that followers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller executes the call and
+    every caller arriving while it is in flight waits for and shares its result.
+
+    Followers wait at most until their own query's deadline, and a leader stopped by the
+    deadline of its query doesn't fail followers with budget left; they call again instead.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Execute fn, or wait for the in-flight execution with the same key.
+
+        Args:
+            key: Identity of the call, see ResponseCache.make_key
+            fn: Function performing the call
+
+        Returns:
+            The result of fn, shared by all coalesced callers
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            deadline = current_deadline()
+            if deadline is None:
+                call.done.wait()
+            elif not call.done.wait(deadline.remaining()):
+                deadline.fail('waiting for a shared API call')
+            if isinstance(call.error, DeadlineExceeded) and (deadline is None or not deadline.expired):
+                return self.do(key, fn)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
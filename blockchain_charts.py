@@ -0,0 +1,92 @@
+import threading
+import time
+from typing import List, Optional, Dict, Tuple
+
+import numpy as np
+
+
+class ChartSeries:
+    """
+    Locally stored points of one chart series.
+
+    The series is complete from `start` up to its last point. Refreshes only fetch the
+    points newer than the last stored timestamp and merge them in.
+    """
+
+    def __init__(self):
+        self.timestamps = np.empty(0, dtype=np.int64)
+        self.values = np.empty(0, dtype=np.float64)
+        self.start: Optional[int] = None
+        self.refreshed_at: Optional[float] = None
+        self.lock = threading.Lock()
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return int(self.timestamps[-1]) if len(self.timestamps) else None
+
+    def covers(self, start: Optional[int]) -> bool:
+        """
+        Whether the stored points are complete from the given time.
+
+        Args:
+            start (int): Unix timestamp, None for the API's default window
+        """
+        if self.start is None:
+            return False
+        return start is None or self.start <= start
+
+    def is_stale(self, max_age: float) -> bool:
+        """Whether the series was last refreshed more than max_age seconds ago."""
+        return self.refreshed_at is None or time.monotonic() - self.refreshed_at > max_age
+
+    def merge(self, points: List[Dict], start: Optional[int] = None) -> None:
+        """
+        Merge points fetched from the API, which replace stored points with the same timestamp.
+
+        Args:
+            points (list): Points as returned by the charts API, with 'x' and 'y' keys
+            start (int): Time the fetched points are complete from, None if they extend the series
+        """
+        n_points = len(points)
+        timestamps = np.fromiter((point.get('x') or 0 for point in points), dtype=np.int64, count=n_points)
+        values = np.fromiter(
+            (np.nan if point.get('y') is None else point['y'] for point in points),
+            dtype=np.float64,
+            count=n_points
+        )
+
+        keep = ~np.isin(self.timestamps, timestamps)
+        timestamps = np.concatenate([self.timestamps[keep], timestamps])
+        values = np.concatenate([self.values[keep], values])
+        order = np.argsort(timestamps, kind='stable')
+        self.timestamps = timestamps[order]
+        self.values = values[order]
+
+        if start is not None:
+            self.start = start if self.start is None else min(self.start, start)
+        elif self.start is None and len(self.timestamps):
+            self.start = int(self.timestamps[0])
+        self.refreshed_at = time.monotonic()
+
+    def slice(self, lower: Optional[int], upper: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Stored points with lower <= timestamp <= upper."""
+        first = 0 if lower is None else int(np.searchsorted(self.timestamps, lower, side='left'))
+        last = len(self.timestamps) if upper is None else int(np.searchsorted(self.timestamps, upper, side='right'))
+        return self.timestamps[first:last], self.values[first:last]
+
+
+class ChartSeriesStore:
+    """Chart series of a handler, keyed by chart type and API options."""
+
+    def __init__(self):
+        self._series: Dict[Tuple, ChartSeries] = {}
+        self._lock = threading.Lock()
+
+    def get(self, chart_type: str, rolling_average: Optional[str], sampled: Optional[bool]) -> ChartSeries:
+        """Get the series for a chart and its API options, creating it if needed."""
+        key = (chart_type, rolling_average, sampled)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ChartSeries()
+            return series
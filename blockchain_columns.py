@@ -0,0 +1,134 @@
+from typing import Optional, Dict, Any, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    STRING = 'string[pyarrow]'
+except ImportError:
+    STRING = 'string'
+
+# Column dtypes of table schemas. Satoshi amounts, heights, counts and Unix timestamps are
+# nullable int64, hashes are (Arrow-backed if pyarrow is installed) strings, and columns
+# repeating a few values across many rows are categoricals.
+INT = 'Int64'
+FLOAT = 'float64'
+BOOL = 'boolean'
+CATEGORY = 'category'
+DATETIME = 'datetime64[ns]'
+
+# Columns of a table with their dtypes, in order
+Schema = Dict[str, str]
+
+
+def typed_frame(data: Dict[str, Any], schema: Schema) -> pd.DataFrame:
+    """
+    Build a DataFrame from column arrays, converting every column to its dtype in the schema.
+
+    Args:
+        data (dict): Array or list of values per column
+        schema (dict): Columns of the result with their dtypes, in order
+
+    Returns:
+        pd.DataFrame
+    """
+    return pd.DataFrame(
+        {column: pd.Series(data[column], dtype=dtype) for column, dtype in schema.items()},
+        columns=list(schema)
+    )
+
+
+def empty_frame(schema: Schema) -> pd.DataFrame:
+    """Empty result with the columns and dtypes of a schema."""
+    return typed_frame({column: [] for column in schema}, schema)
+
+
+def build_frame(
+    records: Sequence[Dict],
+    schema: Schema,
+    sources: Optional[Dict[str, Optional[str]]] = None,
+    computed: Optional[Dict[str, Any]] = None
+) -> pd.DataFrame:
+    """
+    Build a DataFrame column by column from raw API records, directly in the dtypes of a schema.
+
+    Args:
+        records: Raw API records (decoded JSON objects)
+        schema (dict): Columns of the result with their dtypes, in order
+        sources (dict): API field per column where it differs from the column name, None for
+            columns the records don't provide
+        computed (dict): Precomputed column arrays, or scalars repeated on every row
+
+    Returns:
+        pd.DataFrame
+    """
+    sources = sources or {}
+    computed = computed or {}
+    n_rows = len(records)
+
+    data = {}
+    for column in schema:
+        if column in computed:
+            value = computed[column]
+            data[column] = value if isinstance(value, (list, np.ndarray, pd.Series)) else [value] * n_rows
+            continue
+        key = sources.get(column, column)
+        data[column] = [None] * n_rows if key is None else [record.get(key) for record in records]
+    return typed_frame(data, schema)
+
+
+def _segment_sums(counts: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Sum consecutive segments of values, segment i being counts[i] long. Empty segments sum to 0."""
+    ends = np.cumsum(counts)
+    cumulative = np.zeros(len(values) + 1, dtype=np.int64)
+    np.cumsum(values, out=cumulative[1:])
+    return cumulative[ends] - cumulative[ends - counts]
+
+
+def transaction_aggregates(txs: Sequence[Dict], total_input: bool = True, total_output: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Compute the input/output counts and satoshi totals of raw transactions.
+
+    Input and output values of all transactions are flattened into a single int64 array and
+    summed per transaction in one pass, so totals are exact integer satoshis.
+
+    Args:
+        txs: Raw transactions as returned by /rawtx, /rawblock or /unconfirmed-transactions
+        total_input (bool): Compute the input totals
+        total_output (bool): Compute the output totals
+
+    Returns:
+        Dict with 'inputs_count', 'outputs_count' and the requested 'total_input' and 'total_output' arrays
+    """
+    n_txs = len(txs)
+    inputs = [tx.get('inputs') or () for tx in txs]
+    outputs = [tx.get('out') or () for tx in txs]
+    input_counts = np.fromiter(map(len, inputs), dtype=np.int64, count=n_txs)
+    output_counts = np.fromiter(map(len, outputs), dtype=np.int64, count=n_txs)
+
+    aggregates = {'inputs_count': input_counts, 'outputs_count': output_counts}
+    if total_input:
+        # Coinbase inputs have no prev_out and contribute 0
+        values = np.fromiter(
+            ((inp.get('prev_out') or {}).get('value') or 0 for tx_inputs in inputs for inp in tx_inputs),
+            dtype=np.int64,
+            count=int(input_counts.sum())
+        )
+        aggregates['total_input'] = _segment_sums(input_counts, values)
+    if total_output:
+        values = np.fromiter(
+            (out.get('value') or 0 for tx_outputs in outputs for out in tx_outputs),
+            dtype=np.int64,
+            count=int(output_counts.sum())
+        )
+        aggregates['total_output'] = _segment_sums(output_counts, values)
+    return aggregates
+
+
+def fee_rates(txs: Sequence[Dict]) -> np.ndarray:
+    """Fee rate of raw transactions in satoshis per byte, 0 where the size is unknown."""
+    n_txs = len(txs)
+    fees = np.fromiter((tx.get('fee') or 0 for tx in txs), dtype=np.float64, count=n_txs)
+    sizes = np.fromiter((tx.get('size') or 0 for tx in txs), dtype=np.float64, count=n_txs)
+    return np.divide(fees, sizes, out=np.zeros(n_txs), where=sizes > 0)
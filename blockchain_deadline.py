@@ -0,0 +1,92 @@
+import contextlib
+import contextvars
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Optional, Any, Iterator
+
+# Deadline of the select being served, propagated to worker threads and event loop tasks with the context
+_current: contextvars.ContextVar = contextvars.ContextVar('blockchain_handler_deadline', default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the time budget of a query is spent."""
+
+
+class Deadline:
+    """
+    Time budget of one query.
+
+    Fan-out, pagination and retries check it and stop once it is spent, and tables then
+    return the rows they already have. `exceeded` records that this happened.
+    """
+
+    def __init__(self, budget: float):
+        """
+        Args:
+            budget (float): Seconds the query may take
+        """
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+        self.exceeded = False
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def fail(self, what: str) -> None:
+        """Mark the budget as exceeded and raise DeadlineExceeded."""
+        self.exceeded = True
+        raise DeadlineExceeded(f"Query budget of {self.budget:g}s spent {what}")
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the query being served in the current context, None if there is none."""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def deadline_scope(budget: float) -> Iterator[Optional[Deadline]]:
+    """
+    Run a query under a time budget.
+
+    Yields the new Deadline, or None if the budget is disabled (0) or a deadline is already
+    set, e.g. for a select running inside another one.
+    """
+    if budget <= 0 or _current.get() is not None:
+        yield None
+        return
+    deadline = Deadline(budget)
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def check_deadline(what: str = '') -> None:
+    """Raise DeadlineExceeded if the budget of the current query is spent."""
+    deadline = _current.get()
+    if deadline is not None and deadline.expired:
+        deadline.fail(what)
+
+
+def wait_result(future: Future) -> Any:
+    """
+    Wait for the result of a future, at most until the deadline of the current query.
+
+    Raises:
+        DeadlineExceeded if the budget is spent before the future completes
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return future.result()
+    try:
+        return future.result(timeout=deadline.remaining())
+    except FutureTimeoutError:
+        # The future may have failed with a timeout of its own
+        if future.done():
+            raise
+    deadline.fail('waiting for the API')
@@ -0,0 +1,386 @@
+import json
+import re
+from typing import List, Optional, Dict, Any, FrozenSet, Generator, Iterable, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Top-level arrays holding the transactions of a response. The API sends them after the
+# scalar fields, so a selective decode stops when it reaches one of them.
+LARGE_FIELDS = frozenset({'tx', 'txs'})
+
+# Top-level arrays of objects by endpoint prefix. Selective decodes of these endpoints apply
+# to the fields of every object in the array, e.g. to the blocks of /block-height.
+CONTAINERS = {'/block-height/': 'blocks'}
+
+# Bytes read at a time when streaming a response for a selective decode
+STREAM_CHUNK_SIZE = 16384
+
+_NON_SPACE = re.compile(rb'[^ \t\n\r]')
+_STRING_TAIL = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_STRUCTURAL = re.compile(rb'["\[\]{}]')
+_SCALAR = re.compile(rb'[^,}\] \t\n\r]*')
+
+
+def loads(data: bytes) -> Any:
+    """Decode JSON with orjson if it is installed, otherwise with the standard library."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value: Any) -> bytes:
+    """Encode JSON as compact UTF-8 bytes with orjson if it is installed, otherwise with the standard library."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(',', ':')).encode()
+
+
+class _IncrementalDecoder:
+    """
+    Base of the incremental JSON decoders, fed with chunks of the payload as they arrive.
+
+    The parser is a generator that suspends whenever it needs more bytes. Values are only
+    decoded where the parser asks for them, every other value is scanned over without
+    building any objects, and scanned bytes are released as soon as they are passed.
+    """
+
+    def __init__(self):
+        self.bytes_read = 0
+        self.done = False
+        self.result: Any = None
+
+        self._data = b''
+        self._pos = 0
+        # Start of a value that is being read and must be kept, None while scanning over values
+        self._mark: Optional[int] = None
+        self._parser = self._parse()
+        next(self._parser)
+
+    def _parse(self) -> Generator:
+        raise NotImplementedError
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Feed the next chunk of the payload.
+
+        Returns:
+            True once decoding is complete and no more chunks are needed
+        """
+        if self.done:
+            return True
+        self.bytes_read += len(chunk)
+        try:
+            self._parser.send(chunk)
+        except StopIteration as stop:
+            self.result = stop.value
+            self.done = True
+            self._data = b''
+        return self.done
+
+    def finish(self) -> Any:
+        """
+        Signal the end of the payload.
+
+        Returns:
+            The result of the decoder
+
+        Raises:
+            ValueError if the payload is not a complete JSON object
+        """
+        if not self.done:
+            try:
+                self._parser.send(None)
+            except StopIteration as stop:
+                self.result = stop.value
+                self.done = True
+        return self.result
+
+    def _fill(self) -> Generator:
+        chunk = yield
+        if chunk is None:
+            raise ValueError("Unexpected end of JSON payload")
+        # Bytes before the mark, or before the position when there is none, are no longer needed
+        keep = self._pos if self._mark is None else self._mark
+        self._data = self._data[keep:] + chunk
+        self._pos -= keep
+        if self._mark is not None:
+            self._mark -= keep
+
+    def _peek(self) -> Generator:
+        while True:
+            match = _NON_SPACE.search(self._data, self._pos)
+            if match:
+                self._pos = match.start()
+                return self._data[self._pos:self._pos + 1]
+            self._pos = len(self._data)
+            yield from self._fill()
+
+    def _expect(self, char: bytes) -> Generator:
+        found = yield from self._peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON payload, found {found!r}")
+        self._pos += 1
+
+    def _skip_string(self) -> Generator:
+        while True:
+            match = _STRING_TAIL.match(self._data, self._pos + 1)
+            if match:
+                self._pos = match.end()
+                return
+            yield from self._fill()
+
+    def _skip_value(self) -> Generator:
+        first = yield from self._peek()
+        if first == b'"':
+            yield from self._skip_string()
+        elif first in (b'{', b'['):
+            depth = 0
+            while True:
+                match = _STRUCTURAL.search(self._data, self._pos)
+                if match is None:
+                    self._pos = len(self._data)
+                    yield from self._fill()
+                    continue
+                char = match.group()
+                if char == b'"':
+                    self._pos = match.start()
+                    yield from self._skip_string()
+                    continue
+                depth += 1 if char in (b'{', b'[') else -1
+                self._pos = match.end()
+                if depth == 0:
+                    return
+        else:
+            while True:
+                match = _SCALAR.match(self._data, self._pos)
+                if match.end() < len(self._data):
+                    self._pos = match.end()
+                    return
+                try:
+                    yield from self._fill()
+                except ValueError:
+                    # A scalar may end the payload
+                    self._pos = len(self._data)
+                    return
+
+    def _read_value(self) -> Generator:
+        yield from self._peek()
+        self._mark = self._pos
+        yield from self._skip_value()
+        value = loads(self._data[self._mark:self._pos])
+        self._mark = None
+        return value
+
+    def _read_key(self) -> Generator:
+        if (yield from self._peek()) != b'"':
+            raise ValueError("Expected a key in JSON payload")
+        key = yield from self._read_value()
+        yield from self._expect(b':')
+        return key
+
+    def _next_member(self, closing: bytes) -> Generator:
+        """Consume the separator after a member, returning False at the end of the object or array."""
+        separator = yield from self._peek()
+        self._pos += 1
+        if separator == closing:
+            return False
+        if separator != b',':
+            raise ValueError(f"Expected ',' or {closing!r} in JSON payload, found {separator!r}")
+        return True
+
+
+class FieldDecoder(_IncrementalDecoder):
+    """
+    Incremental decoder of selected top-level fields of a JSON object.
+
+    Decoding stops as soon as all selected fields were read or a field in stop_at is
+    reached, so the rest of the payload is never read. The result is a dict of the
+    decoded fields, missing fields are left out.
+    """
+
+    def __init__(self, fields: Iterable[str], stop_at: FrozenSet[str] = LARGE_FIELDS):
+        """
+        Args:
+            fields: Top-level fields to decode
+            stop_at: Fields that end the decode when reached, unless they are selected
+        """
+        self.fields = frozenset(fields)
+        self.stop_at = stop_at - self.fields
+        super().__init__()
+
+    def _parse(self) -> Generator:
+        result = {}
+        remaining = set(self.fields)
+        yield from self._expect(b'{')
+        if (yield from self._peek()) == b'}':
+            return result
+
+        while remaining:
+            key = yield from self._read_key()
+            if key in self.stop_at:
+                break
+            if key in remaining:
+                result[key] = yield from self._read_value()
+                remaining.discard(key)
+            else:
+                yield from self._skip_value()
+            if not (yield from self._next_member(b'}')):
+                break
+        return result
+
+
+class ContainerFieldDecoder(_IncrementalDecoder):
+    """
+    Incremental decoder of selected fields of the objects in a top-level array.
+
+    Every other field, e.g. the transaction list of each block, is scanned over without
+    building any objects. Decoding stops at the end of the array, and the result holds the
+    decoded objects under the name of the array.
+    """
+
+    def __init__(self, fields: Iterable[str], container: str):
+        """
+        Args:
+            fields: Fields to decode from each object of the array
+            container (str): Top-level field holding the array
+        """
+        self.fields = frozenset(fields)
+        self.container = container
+        super().__init__()
+
+    def _parse(self) -> Generator:
+        objects = []
+        result = {self.container: objects}
+        yield from self._expect(b'{')
+        if (yield from self._peek()) == b'}':
+            return result
+
+        while True:
+            key = yield from self._read_key()
+            if key == self.container:
+                yield from self._expect(b'[')
+                if (yield from self._peek()) == b']':
+                    return result
+                while True:
+                    objects.append((yield from self._read_object()))
+                    if not (yield from self._next_member(b']')):
+                        return result
+            yield from self._skip_value()
+            if not (yield from self._next_member(b'}')):
+                return result
+
+    def _read_object(self) -> Generator:
+        obj = {}
+        yield from self._expect(b'{')
+        if (yield from self._peek()) == b'}':
+            self._pos += 1
+            return obj
+        while True:
+            key = yield from self._read_key()
+            if key in self.fields:
+                obj[key] = yield from self._read_value()
+            else:
+                yield from self._skip_value()
+            if not (yield from self._next_member(b'}')):
+                return obj
+
+
+class BlockTransactionDecoder(_IncrementalDecoder):
+    """
+    Incremental decoder of the transactions of blocks.
+
+    Decodes a /rawblock object, or the blocks array of a /block-height response, one
+    transaction at a time. Transactions are collected with the block fields read before the
+    `tx` array, which the API sends last, and are handed out with `take` between chunks, so
+    memory stays bounded by the chunk size rather than the block size. Transactions of
+    blocks off the main chain are skipped.
+    """
+
+    def __init__(self, block_fields: Iterable[str], container: Optional[str] = None):
+        """
+        Args:
+            block_fields: Block fields to decode and pair with its transactions
+            container (str): Top-level field holding an array of blocks, None if the payload is a block
+        """
+        self.block_fields = frozenset(block_fields) | {'main_chain'}
+        self.container = container
+        self._items: List[Tuple[Dict, Dict]] = []
+        super().__init__()
+
+    def take(self) -> List[Tuple[Dict, Dict]]:
+        """Hand out the (block, transaction) pairs decoded since the last call."""
+        items, self._items = self._items, []
+        return items
+
+    def _parse(self) -> Generator:
+        yield from self._expect(b'{')
+        if self.container is None:
+            yield from self._parse_block()
+            return None
+
+        if (yield from self._peek()) == b'}':
+            return None
+        while True:
+            key = yield from self._read_key()
+            if key == self.container:
+                break
+            yield from self._skip_value()
+            if not (yield from self._next_member(b'}')):
+                return None
+
+        yield from self._expect(b'[')
+        if (yield from self._peek()) == b']':
+            return None
+        while True:
+            yield from self._expect(b'{')
+            yield from self._parse_block()
+            if not (yield from self._next_member(b']')):
+                return None
+
+    def _parse_block(self) -> Generator:
+        # The opening brace is already consumed
+        block = {}
+        if (yield from self._peek()) == b'}':
+            self._pos += 1
+            return
+        while True:
+            key = yield from self._read_key()
+            if key == 'tx' and block.get('main_chain', True) is not False:
+                yield from self._parse_transactions(block)
+            elif key in self.block_fields:
+                block[key] = yield from self._read_value()
+            else:
+                yield from self._skip_value()
+            if not (yield from self._next_member(b'}')):
+                return
+
+    def _parse_transactions(self, block: Dict) -> Generator:
+        yield from self._expect(b'[')
+        if (yield from self._peek()) == b']':
+            self._pos += 1
+            return
+        while True:
+            tx = yield from self._read_value()
+            self._items.append((block, tx))
+            if not (yield from self._next_member(b']')):
+                return
+
+
+def field_decoder(endpoint: str, fields: Iterable[str]) -> _IncrementalDecoder:
+    """Selective decoder of a response: of the objects in its array for endpoints in CONTAINERS, else of its top-level fields."""
+    for prefix, container in CONTAINERS.items():
+        if endpoint.startswith(prefix):
+            return ContainerFieldDecoder(fields, container)
+    return FieldDecoder(fields)
+
+
+def decode_fields(chunks: Iterable[bytes], fields: Iterable[str], stop_at: FrozenSet[str] = LARGE_FIELDS) -> Dict:
+    """Decode selected top-level fields from an iterable of payload chunks, see FieldDecoder."""
+    decoder = FieldDecoder(fields, stop_at)
+    for chunk in chunks:
+        if decoder.feed(chunk):
+            break
+    return decoder.finish()
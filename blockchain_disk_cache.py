@@ -0,0 +1,155 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import List, Any, Hashable, Tuple
+
+from mindsdb.utilities import log
+
+from .blockchain_decode import dumps, loads
+
+logger = log.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+# Access times are refreshed on hits at most this often, so reads rarely need the write lock
+_TOUCH_INTERVAL = 60.0
+
+# The size of the store is checked after this many writes of a process
+_EVICTION_CHECK_WRITES = 64
+
+
+class DiskCache:
+    """
+    Cache of immutable API responses in a single SQLite file, shared by all processes on a host.
+
+    The database runs in WAL mode, so readers in every process proceed while one process
+    writes. Payloads are stored as zlib-compressed JSON, and the store is bounded by a byte
+    budget on the compressed payloads, evicting the least recently accessed entries first.
+    Errors of the store are logged and treated as cache misses, never failing a query.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        """
+        Args:
+            path (str): Database file, created if missing
+            max_bytes (int): Byte budget of the compressed payloads
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._evict()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, as sqlite3 connections must not be used concurrently
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=1.0, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @staticmethod
+    def make_key(key: Hashable) -> str:
+        """Text key of a ResponseCache key, stable across processes."""
+        return json.dumps(key, separators=(',', ':'))
+
+    def get(self, key: Hashable) -> Tuple[bool, Any, int]:
+        """
+        Look up a stored response.
+
+        Returns:
+            Tuple of (hit, value, size of the uncompressed JSON in bytes)
+        """
+        text_key = self.make_key(key)
+        try:
+            connection = self._connection()
+            row = connection.execute('SELECT payload, accessed FROM entries WHERE key = ?', (text_key,)).fetchone()
+            if row is None:
+                return False, None, 0
+            payload, accessed = row
+            now = time.time()
+            if now - accessed > _TOUCH_INTERVAL:
+                connection.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, text_key))
+            raw = zlib.decompress(payload)
+            return True, loads(raw), len(raw)
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            logger.warning(f"Disk cache lookup failed: {e}")
+            return False, None, 0
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a response, replacing an entry with the same key."""
+        try:
+            payload = zlib.compress(dumps(value))
+            if len(payload) > self.max_bytes:
+                return
+            self._connection().execute(
+                'INSERT OR REPLACE INTO entries (key, payload, size, accessed) VALUES (?, ?, ?, ?)',
+                (self.make_key(key), payload, len(payload), time.time())
+            )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Disk cache write failed: {e}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            check = self._writes % _EVICTION_CHECK_WRITES == 0
+        if check:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Delete the least recently accessed entries until the store is 10% below its budget."""
+        try:
+            connection = self._connection()
+            total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            excess = total - int(self.max_bytes * 0.9)
+            keys = []
+            cursor = connection.execute('SELECT key, size FROM entries ORDER BY accessed')
+            for key, size in cursor:
+                keys.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            cursor.close()
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.executemany('DELETE FROM entries WHERE key = ?', keys)
+                connection.execute('COMMIT')
+            except sqlite3.Error:
+                connection.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache eviction failed: {e}")
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def close(self) -> None:
+        """Close the connections of all threads."""
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -1,5 +1,13 @@
+import asyncio
+import contextvars
+import re
 import requests
-from typing import Optional, Dict, Any
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional, Dict, Any, Callable, FrozenSet, Iterable, Iterator, Tuple
+import pandas as pd
 from mindsdb.integrations.libs.api_handler import APIHandler
 from mindsdb.integrations.libs.response import (
     HandlerStatusResponse as StatusResponse,
@@ -8,17 +16,46 @@ from mindsdb.integrations.libs.response import (
 )
 from mindsdb.utilities import log
 from mindsdb_sql_parser import parse_sql
+from mindsdb_sql_parser.ast import Select
+from mindsdb_sql_parser.ast.base import ASTNode
+from .blockchain_transport import BlockchainTransport, TokenBucketRateLimiter
+from .blockchain_async import AsyncBlockchainClient, is_available as async_engine_available
+from .blockchain_deadline import DeadlineExceeded, current_deadline, wait_result
+from .blockchain_decode import STREAM_CHUNK_SIZE, field_decoder, loads
+from .blockchain_metrics import HandlerMetrics, ProfilingHook
+from .blockchain_pushdown import selected_targets
+from .blockchain_cache import ResponseCache, SingleFlight, IMMUTABLE, NEAR_TIP, DAILY
+from .blockchain_disk_cache import DiskCache
+from .blockchain_headers import HeaderIndex
+from .blockchain_columns import typed_frame
+from .blockchain_materialize import (
+    MaterializedStore,
+    MATERIALIZED_TABLES,
+    EXPORT_SCHEMA,
+    is_available as materialize_available
+)
+from .blockchain_charts import ChartSeriesStore
+from .blockchain_mempool import MempoolIndex
+from .blockchain_stats import StatsHistory, StatsPoller
 from .blockchain_tables import (
     BlocksTable,
     TransactionsTable,
+    BlockTransactionsTable,
     AddressesTable,
+    AddressTransactionsTable,
     ChartsTable,
     StatsTable,
-    UnconfirmedTransactionsTable
+    StatsHistoryTable,
+    UnconfirmedTransactionsTable,
+    MempoolFeeHistogramTable,
+    HandlerMetricsTable
 )
 
 logger = log.getLogger(__name__)
 
+# MATERIALIZE <table> FROM <height> TO <height>, handled by the handler instead of the SQL parser
+MATERIALIZE_QUERY = re.compile(r'^\s*MATERIALIZE\s+(\w+)\s+FROM\s+(\d+)\s+TO\s+(\d+)\s*;?\s*$', re.IGNORECASE)
+
 
 class BlockchainHandler(APIHandler):
     """
@@ -40,6 +77,7 @@ class BlockchainHandler(APIHandler):
         # Connection parameters
         connection_data = kwargs.get('connection_data', {})
         self.base_url = connection_data.get('base_url', 'https://blockchain.info')
+        self.charts_base_url = connection_data.get('charts_base_url', 'https://api.blockchain.info')
         self.cors = connection_data.get('cors', True)
         
         # API configuration
@@ -48,13 +86,128 @@ class BlockchainHandler(APIHandler):
             'Accept': 'application/json'
         }
         
+        # Latency, size, retry and cache metrics of the hot paths, queryable as handler_metrics
+        self.metrics = HandlerMetrics()
+        
+        # Transport: pooled keep-alive sessions, timeouts, rate limiting and retries
+        rate_limit = float(connection_data.get('rate_limit', 5.0))
+        rate_limiter = None
+        if rate_limit > 0:
+            rate_limiter = TokenBucketRateLimiter(rate_limit, int(connection_data.get('rate_limit_burst', 10)))
+        self.transport = BlockchainTransport(
+            headers=self.headers,
+            connect_timeout=float(connection_data.get('connect_timeout', 5.0)),
+            read_timeout=float(connection_data.get('read_timeout', 30.0)),
+            pool_size=int(connection_data.get('pool_size', 10)),
+            max_retries=int(connection_data.get('max_retries', 3)),
+            backoff_factor=float(connection_data.get('backoff_factor', 0.5)),
+            rate_limiter=rate_limiter,
+            metrics=self.metrics,
+            failure_threshold=int(connection_data.get('circuit_failure_threshold', 5)),
+            reset_timeout=float(connection_data.get('circuit_reset_timeout', 30))
+        )
+        
+        # Time budget of every select; fan-out, pagination and retries stop when it is spent
+        self.query_timeout = float(connection_data.get('query_timeout', 60))
+        
+        # check_connection reuses recent results instead of sending a request every time
+        self.health_check_ttl = float(connection_data.get('health_check_ttl', 30))
+        self._health: Optional[Tuple[float, StatusResponse]] = None
+        
+        # Response cache, sorted into freshness classes and bounded by a byte budget
+        self.cache_confirmations = int(connection_data.get('cache_confirmations', 6))
+        self.cache = ResponseCache(
+            max_bytes=int(float(connection_data.get('cache_size_mb', 64)) * 1024 * 1024),
+            ttls={
+                IMMUTABLE: None,
+                NEAR_TIP: float(connection_data.get('cache_near_tip_ttl', 10)),
+                DAILY: float(connection_data.get('cache_daily_ttl', 3600))
+            }
+        )
+        self.tip_height: Optional[int] = None
+        
+        # Optional second level for immutable responses, shared by all processes on the host
+        disk_cache_path = connection_data.get('disk_cache_path')
+        self.disk_cache = None
+        if disk_cache_path:
+            self.disk_cache = DiskCache(
+                disk_cache_path,
+                max_bytes=int(float(connection_data.get('disk_cache_size_mb', 1024)) * 1024 * 1024)
+            )
+        
+        # Concurrent identical calls, e.g. from several sessions refreshing at once, share one request
+        self._inflight = SingleFlight()
+        
+        # Bounded worker pool for fan-out queries; the rate limiter still applies to every call
+        self.max_workers = int(connection_data.get('max_workers', 8))
+        self.max_block_range = int(connection_data.get('max_block_range', 10000))
+        self.max_time_range_days = int(connection_data.get('max_time_range_days', 366))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        
+        # Asyncio engine for fan-out queries: one event loop thread with many requests in flight.
+        # Falls back to the worker pool when disabled or when aiohttp is not installed.
+        self.async_engine = bool(connection_data.get('async_engine', True))
+        if self.async_engine and not async_engine_available():
+            logger.info("aiohttp is not installed, fan-out queries use the worker pool instead of the async engine")
+            self.async_engine = False
+        self.async_concurrency = int(connection_data.get('async_concurrency', 32))
+        self._async_client: Optional[AsyncBlockchainClient] = None
+        self._async_inflight: Dict[Tuple, asyncio.Future] = {}
+        
+        # Rows per chunk when block transactions are decoded incrementally
+        self.block_tx_chunk_size = int(connection_data.get('block_tx_chunk_size', 1000))
+        
+        # Page size for /rawaddr history pagination
+        self.address_page_size = int(connection_data.get('address_page_size', 50))
+        
+        # Address lists are split into /multiaddr calls of this many addresses, run concurrently
+        self.multiaddr_chunk_size = int(connection_data.get('multiaddr_chunk_size', 100))
+        # Fill n_unredeemed of address lists with one /rawaddr call per address
+        self.address_fill_unredeemed = bool(connection_data.get('address_fill_unredeemed', False))
+        
+        # Locally stored chart series, refreshed with delta fetches
+        self.chart_series = ChartSeriesStore()
+        self.charts_refresh_interval = float(connection_data.get('charts_refresh_interval', 300))
+        
+        # Live mempool index, merged from /unconfirmed-transactions snapshots
+        self.mempool = MempoolIndex(max_age=float(connection_data.get('mempool_max_age', 3 * 3600)))
+        self.mempool_refresh_interval = float(connection_data.get('mempool_refresh_interval', 10))
+        
+        # Ring buffer of /stats samples, filled by an optional background poller
+        self.stats_history = StatsHistory(int(connection_data.get('stats_history_size', 8640)))
+        stats_poll_interval = float(connection_data.get('stats_poll_interval', 0))
+        self.stats_poller = StatsPoller(self, self.stats_history, stats_poll_interval) if stats_poll_interval > 0 else None
+        
+        # Optional persistent block header index maintained by the blocks table
+        header_index_path = connection_data.get('header_index_path')
+        self.header_index = HeaderIndex(header_index_path) if header_index_path else None
+        self.header_sync_interval = float(connection_data.get('header_sync_interval', 30))
+        self.header_sync_depth = int(connection_data.get('header_sync_depth', 144))
+        
+        # Optional columnar partitions of height ranges, read instead of the API where they cover a query
+        materialize_path = connection_data.get('materialize_path')
+        self.materialized = None
+        if materialize_path:
+            if materialize_available():
+                self.materialized = MaterializedStore(
+                    materialize_path, int(connection_data.get('materialize_partition_blocks', 1000))
+                )
+            else:
+                logger.warning("pyarrow is not installed, materialize_path is ignored")
+        
         # Register available tables
         self._register_table('blocks', BlocksTable(self))
         self._register_table('transactions', TransactionsTable(self))
+        self._register_table('block_transactions', BlockTransactionsTable(self))
         self._register_table('addresses', AddressesTable(self))
+        self._register_table('address_transactions', AddressTransactionsTable(self))
         self._register_table('charts', ChartsTable(self))
         self._register_table('stats', StatsTable(self))
+        self._register_table('stats_history', StatsHistoryTable(self))
         self._register_table('unconfirmed_transactions', UnconfirmedTransactionsTable(self))
+        self._register_table('mempool_fee_histogram', MempoolFeeHistogramTable(self))
+        self._register_table('handler_metrics', HandlerMetricsTable(self))
         
     def connect(self) -> StatusResponse:
         """
@@ -68,6 +221,7 @@ class BlockchainHandler(APIHandler):
             response = self.call_blockchain_api('/latestblock')
             if response and 'hash' in response:
                 self.is_connected = True
+                self.start_stats_poller()
                 return StatusResponse(True)
             else:
                 self.is_connected = False
@@ -81,10 +235,50 @@ class BlockchainHandler(APIHandler):
         """
         Check if the connection is alive and healthy.
         
+        The API is only asked when nothing is known about its health: an open circuit fails
+        right away, and a successful response or check within health_check_ttl seconds passes.
+        
         Returns:
             HandlerStatusResponse
         """
-        return self.connect()
+        breaker = self.transport.breaker(self.base_url)
+        if breaker.is_open:
+            self.is_connected = False
+            return StatusResponse(
+                False,
+                f"Connection failed: Blockchain.com API is failing, next attempt in {breaker.retry_in():.0f}s"
+            )
+        
+        now = time.monotonic()
+        if breaker.last_success is not None and now - breaker.last_success < self.health_check_ttl:
+            self.is_connected = True
+            return StatusResponse(True)
+        if self._health is not None and now - self._health[0] < self.health_check_ttl:
+            return self._health[1]
+        
+        status = self.connect()
+        self._health = (time.monotonic(), status)
+        return status
+    
+    def disconnect(self):
+        """
+        Close any existing connections.
+        """
+        if self.stats_poller is not None:
+            self.stats_poller.stop()
+        self.transport.close()
+        if self._async_client is not None:
+            self._async_client.close()
+            self._async_client = None
+            self._async_inflight.clear()
+        if self.header_index is not None:
+            self.header_index.flush()
+        if self.disk_cache is not None:
+            self.disk_cache.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.is_connected = False
     
     def native_query(self, query: str) -> Response:
         """
@@ -96,41 +290,558 @@ class BlockchainHandler(APIHandler):
         Returns:
             HandlerResponse
         """
+        match = MATERIALIZE_QUERY.match(query)
+        if match:
+            try:
+                df = self.materialize(match.group(1), int(match.group(2)), int(match.group(3)))
+            except Exception as e:
+                logger.error(f"Error materializing {match.group(1)}: {e}")
+                return Response(RESPONSE_TYPE.ERROR, error_message=str(e))
+            return Response(RESPONSE_TYPE.TABLE, data_frame=df)
+        
         ast = parse_sql(query, dialect='mindsdb')
         return self.query(ast)
     
-    def call_blockchain_api(self, endpoint: str, params: Optional[Dict] = None) -> Any:
+    def query(self, query: ASTNode) -> Response:
         """
-        Call Blockchain.com API endpoint.
+        Execute a parsed query.
+        
+        APIHandler.query passes SELECTs to the tables with their targets replaced by *, so the
+        original targets are kept aside for column pushdown, see QueryPushdown.
         
         Args:
-            endpoint (str): API endpoint path
-            params (dict): Optional query parameters
+            query (ASTNode): Parsed query
             
         Returns:
-            API response data
+            HandlerResponse
+        """
+        if isinstance(query, Select):
+            with selected_targets(query.targets):
+                return super().query(query)
+        return super().query(query)
+    
+    def materialize(self, table_name: str, lower: int, upper: int) -> pd.DataFrame:
+        """
+        Export the rows of a table for a height range to columnar partitions under materialize_path.
+        
+        Partitions are exported whole, so the range is widened to partition boundaries.
+        Partitions that already exist are skipped, so an interrupted export continues where it
+        stopped, and partitions within cache_confirmations of the tip wait until they settle.
+        
+        Args:
+            table_name (str): 'blocks' or 'block_transactions'
+            lower (int): First height
+            upper (int): Last height
+            
+        Returns:
+            One row per partition with its heights, status ('exists', 'written' or 'pending') and rows written
+        """
+        if self.materialized is None:
+            raise ValueError("Set materialize_path, with pyarrow installed, to materialize height ranges")
+        if table_name not in MATERIALIZED_TABLES:
+            raise ValueError(f"Only {', '.join(MATERIALIZED_TABLES)} can be materialized, not {table_name}")
+        if lower > upper:
+            raise ValueError(f"Empty height range from {lower} to {upper}")
+        
+        latest = self.call_blockchain_api('/latestblock')
+        if not latest or latest.get('height') is None:
+            raise ValueError("Could not determine the chain tip")
+        settled = int(latest['height']) - self.cache_confirmations
+        
+        table = self._tables[table_name]
+        store = self.materialized
+        data = {column: [] for column in EXPORT_SCHEMA}
+        for partition in store.partitions(lower, upper):
+            first, last = store.bounds(partition)
+            n_rows = None
+            if store.has(table_name, partition):
+                status = 'exists'
+            elif last > settled:
+                status = 'pending'
+            else:
+                started = time.perf_counter()
+                n_rows = store.write(table_name, partition, table.iter_height_frames(first, last))
+                status = 'written'
+                logger.info(
+                    f"Materialized {n_rows} rows of {table_name} for heights {first} to {last} "
+                    f"in {time.perf_counter() - started:.1f}s"
+                )
+            for column, value in zip(EXPORT_SCHEMA, (table_name, first, last, status, n_rows)):
+                data[column].append(value)
+        return typed_frame(data, EXPORT_SCHEMA)
+    
+    def set_profiling_hook(self, hook: Optional[ProfilingHook]) -> None:
+        """
+        Set a callback receiving every metric observation of the handler.
+        
+        Args:
+            hook: Called as hook(scope, name, metric, value), e.g. ('endpoint', '/rawblock', 'latency_ms', 120.5),
+                or None to remove the current hook
+        """
+        self.metrics.hook = hook
+    
+    def _prepare_call(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        fields: Optional[FrozenSet[str]] = None
+    ) -> Tuple[str, Dict, Tuple]:
+        """
+        Resolve the base URL, the final query parameters and the cache key of an API call.
+        
+        Returns:
+            Tuple of (base_url, params, cache_key), the key of a selective decode includes its fields
         """
         # FIXED: Charts endpoints need api.blockchain.info instead of blockchain.info
         if endpoint.startswith('/charts/'):
-            base_url = 'https://api.blockchain.info'
+            base_url = self.charts_base_url
         else:
             base_url = self.base_url
-            
-        url = base_url + endpoint
+        
+        # Copy so that the caller's params are never mutated
+        params = dict(params or {})
         
         # Add CORS parameter if enabled
         if self.cors:
-            if params is None:
-                params = {}
             params['cors'] = 'true'
         
+        cache_key = ResponseCache.make_key(endpoint, params)
+        if fields is not None:
+            cache_key += (tuple(sorted(fields)),)
+        return base_url, params, cache_key
+    
+    def _cache_lookup(self, cache_key: Tuple, fields: Optional[FrozenSet[str]]) -> Tuple[bool, Any]:
+        """
+        Look up a response in memory, then on disk, where a cached full response also serves a selective decode.
+        
+        Responses found on disk are immutable and kept in memory from then on.
+        """
+        keys = [cache_key] if fields is None else [cache_key, cache_key[:-1]]
+        for key in keys:
+            hit, data = self.cache.get(key)
+            if hit:
+                self.metrics.record_cache(True)
+                return True, data
+        self.metrics.record_cache(False)
+        
+        if self.disk_cache is None:
+            return False, None
+        for key in keys:
+            hit, data, size = self.disk_cache.get(key)
+            if hit:
+                self.metrics.record_cache(True, 'disk_cache')
+                self.cache.put(key, data, size, IMMUTABLE)
+                return True, data
+        self.metrics.record_cache(False, 'disk_cache')
+        return False, None
+    
+    def call_blockchain_api(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        fields: Optional[Iterable[str]] = None,
+        cache: bool = True
+    ) -> Any:
+        """
+        Call Blockchain.com API endpoint.
+        
+        Args:
+            endpoint (str): API endpoint path
+            params (dict): Optional query parameters
+            fields: Only decode these top-level fields of the response, or these fields of the blocks
+                of /block-height, see field_decoder. The response may contain more fields, e.g. when
+                it is served from the cache.
+            cache (bool): Serve the call from the response cache and store its response there
+            
+        Returns:
+            API response data
+        """
+        fields = frozenset(fields) if fields is not None else None
+        base_url, params, cache_key = self._prepare_call(endpoint, params, fields)
+        if cache:
+            hit, data = self._cache_lookup(cache_key, fields)
+            if hit:
+                return data
+        else:
+            # Kept apart from cached calls, which may share the response of this one
+            cache_key += ('uncached',)
+        
+        return self._inflight.do(cache_key, lambda: self._fetch(base_url, endpoint, params, cache_key, fields, cache))
+    
+    async def call_blockchain_api_async(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        fields: Optional[Iterable[str]] = None,
+        cache: bool = True
+    ) -> Any:
+        """
+        Call Blockchain.com API endpoint on the async engine's event loop.
+        
+        Args:
+            endpoint (str): API endpoint path
+            params (dict): Optional query parameters
+            fields: Only decode these top-level fields of the response, see call_blockchain_api
+            cache (bool): Serve the call from the response cache and store its response there
+            
+        Returns:
+            API response data
+        """
+        fields = frozenset(fields) if fields is not None else None
+        base_url, params, cache_key = self._prepare_call(endpoint, params, fields)
+        if cache:
+            hit, data = self._cache_lookup(cache_key, fields)
+            if hit:
+                return data
+        else:
+            cache_key += ('uncached',)
+        
+        # Identical calls in flight on the event loop share one request, see SingleFlight
+        deadline = current_deadline()
+        while True:
+            task = self._async_inflight.get(cache_key)
+            leader = task is None
+            if leader:
+                task = asyncio.ensure_future(self._fetch_async(base_url, endpoint, params, cache_key, fields, cache))
+                self._async_inflight[cache_key] = task
+                task.add_done_callback(lambda _: self._async_inflight.pop(cache_key, None))
+            try:
+                # Shielded so that a cancelled caller doesn't cancel the request for the others
+                if deadline is None or leader:
+                    return await asyncio.shield(task)
+                return await asyncio.wait_for(asyncio.shield(task), deadline.remaining())
+            except DeadlineExceeded:
+                # The budget of the leader's query was spent, followers with budget left call again
+                if leader or (deadline is not None and deadline.expired):
+                    raise
+            except asyncio.TimeoutError:
+                # The request may have failed with a timeout of its own
+                if task.done():
+                    raise
+                deadline.fail('waiting for a shared API call')
+    
+    async def _fetch_async(
+        self,
+        base_url: str,
+        endpoint: str,
+        params: Dict,
+        cache_key: Tuple,
+        fields: Optional[FrozenSet[str]] = None,
+        cache: bool = True
+    ) -> Any:
+        """Async counterpart of _fetch, run on the async engine's event loop."""
         try:
-            response = requests.get(url, headers=self.headers, params=params or {})
-            response.raise_for_status()
-            return response.json()
+            data, size = await self._async_client.get_json(base_url, endpoint, params, fields)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            self.metrics.record_error(endpoint)
+            logger.error(f"API request failed: {e}")
+            raise
+        
+        if cache:
+            self._store(endpoint, cache_key, data, size)
+        return data
+    
+    def _fetch(
+        self,
+        base_url: str,
+        endpoint: str,
+        params: Dict,
+        cache_key: Tuple,
+        fields: Optional[FrozenSet[str]] = None,
+        cache: bool = True
+    ) -> Any:
+        """
+        Send an API request and cache the decoded response by its freshness class.
+        
+        Args:
+            base_url (str): Scheme and host of the API
+            endpoint (str): API endpoint path
+            params (dict): Query parameters
+            cache_key (tuple): Key of the response in the cache
+            fields (frozenset): Only decode these top-level fields, streaming the response
+            cache (bool): Store the response in the cache
+            
+        Returns:
+            API response data
+        """
+        started = time.perf_counter()
+        try:
+            if fields is None:
+                response = self.transport.get(base_url, endpoint, params)
+                received = time.perf_counter()
+                data = loads(response.content)
+                size = len(response.content)
+                decode_time = time.perf_counter() - received
+            else:
+                data, size, decode_time = self._fetch_fields(base_url, endpoint, params, fields)
+        except DeadlineExceeded:
+            raise
         except requests.exceptions.RequestException as e:
+            self.metrics.record_error(endpoint)
             logger.error(f"API request failed: {e}")
             raise
         except Exception as e:
+            self.metrics.record_error(endpoint)
             logger.error(f"Unexpected error in API call: {e}")
-            raise 
\ No newline at end of file
+            raise
+        
+        self.metrics.record_request(endpoint, time.perf_counter() - started - decode_time, size, decode_time)
+        if cache:
+            self._store(endpoint, cache_key, data, size)
+        return data
+    
+    def _fetch_fields(self, base_url: str, endpoint: str, params: Dict, fields: FrozenSet[str]) -> Tuple[Dict, int, float]:
+        """
+        Stream a response and decode only the given fields, see field_decoder.
+        
+        The connection is closed once they are read, so the rest of the payload, e.g. the
+        transactions of a block, is neither downloaded in full nor decoded.
+        
+        Returns:
+            Tuple of (decoded fields, bytes read, seconds spent decoding)
+        """
+        decoder = field_decoder(endpoint, fields)
+        decode_time = 0.0
+        response = self.transport.get(base_url, endpoint, params, stream=True)
+        try:
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                decode_started = time.perf_counter()
+                done = decoder.feed(chunk)
+                decode_time += time.perf_counter() - decode_started
+                if done:
+                    break
+            return decoder.finish(), decoder.bytes_read, decode_time
+        finally:
+            response.close()
+    
+    def _store(self, endpoint: str, cache_key: Tuple, data: Any, size: int) -> None:
+        """Cache a decoded response under the TTL of its freshness class, and on disk if it is immutable."""
+        freshness = self._classify_response(endpoint, data)
+        if freshness is not None:
+            self.cache.put(cache_key, data, size, freshness)
+        if freshness == IMMUTABLE and self.disk_cache is not None:
+            self.disk_cache.put(cache_key, data)
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='blockchain_handler'
+                    )
+        return self._executor
+    
+    def _get_async_client(self) -> AsyncBlockchainClient:
+        if self._async_client is None:
+            with self._executor_lock:
+                if self._async_client is None:
+                    self._async_client = AsyncBlockchainClient(
+                        headers=self.headers,
+                        connect_timeout=self.transport.timeout[0],
+                        read_timeout=self.transport.timeout[1],
+                        concurrency=self.async_concurrency,
+                        max_retries=self.transport.max_retries,
+                        backoff_factor=self.transport.backoff_factor,
+                        max_backoff=self.transport.max_backoff,
+                        rate_limiter=self.transport.rate_limiter,
+                        metrics=self.metrics,
+                        breaker_for=self.transport.breaker
+                    )
+        return self._async_client
+    
+    def _submit(self, fn: Callable, *args) -> Future:
+        """Run a function on the worker pool in a copy of the caller's context, so that its deadline applies."""
+        return self._get_executor().submit(contextvars.copy_context().run, fn, *args)
+    
+    def refresh_mempool(self) -> MempoolIndex:
+        """
+        Merge a new /unconfirmed-transactions snapshot into the mempool index if it is stale.
+        
+        Returns:
+            MempoolIndex
+        """
+        if self.mempool.is_stale(self.mempool_refresh_interval):
+            response = self.call_blockchain_api('/unconfirmed-transactions', {'format': 'json'})
+            with self.mempool.lock:
+                if self.mempool.is_stale(self.mempool_refresh_interval):
+                    self.mempool.merge(response.get('txs', []) if response else [])
+        return self.mempool
+    
+    def start_stats_poller(self) -> Optional[StatsPoller]:
+        """
+        Start the background stats poller if it is configured and not running yet.
+        
+        Returns:
+            StatsPoller, or None if stats polling is disabled
+        """
+        if self.stats_poller is not None and not self.stats_poller.running:
+            self.stats_poller.start()
+        return self.stats_poller
+    
+    def prefetch(self, endpoint: str, params: Optional[Dict] = None) -> Future:
+        """
+        Start an API call in the background, on the async engine or the worker pool.
+        
+        Args:
+            endpoint (str): API endpoint path
+            params (dict): Optional query parameters
+            
+        Returns:
+            Future resolving to the API response data
+        """
+        if self.async_engine:
+            return self._get_async_client().submit(self.call_blockchain_api_async(endpoint, params))
+        return self._submit(self.call_blockchain_api, endpoint, params)
+    
+    def open_stream(self, endpoint: str, params: Optional[Dict] = None) -> requests.Response:
+        """
+        Send an API request without reading the response body, for incremental decoding.
+        
+        Streamed responses bypass the cache, and the caller must close them.
+        
+        Args:
+            endpoint (str): API endpoint path
+            params (dict): Optional query parameters
+            
+        Returns:
+            requests.Response with a successful status code
+        """
+        base_url, params, _ = self._prepare_call(endpoint, params)
+        try:
+            return self.transport.get(base_url, endpoint, params, stream=True)
+        except requests.exceptions.RequestException as e:
+            self.metrics.record_error(endpoint)
+            logger.error(f"API request failed: {e}")
+            raise
+    
+    def prefetch_stream(self, endpoint: str, params: Optional[Dict] = None) -> Future:
+        """
+        Open a streamed response in the background on the worker pool, see open_stream.
+        
+        Returns:
+            Future resolving to the requests.Response
+        """
+        return self._submit(self.open_stream, endpoint, params)
+    
+    def fetch_many(
+        self,
+        calls: Iterable[Tuple[str, Optional[Dict]]],
+        ignore_errors: bool = False,
+        fields: Optional[Iterable[str]] = None,
+        cache: bool = True,
+        missing_ok: bool = False
+    ) -> Iterator[Any]:
+        """
+        Call many API endpoints concurrently, on the async engine or the bounded worker pool.
+        
+        Results are yielded in the order of the calls while later calls are still in flight,
+        and calls not yet started are cancelled if the consumer stops early. Once the deadline
+        of the query is spent the iterator ends, leaving the caller with partial results.
+        
+        Args:
+            calls: Iterable of (endpoint, params) tuples
+            ignore_errors (bool): Yield None for failed calls instead of raising
+            fields: Only decode these top-level fields of every response, see call_blockchain_api
+            cache (bool): Serve the calls from the response cache and store their responses there
+            missing_ok (bool): Yield None for calls answered with 404 Not Found instead of raising
+            
+        Returns:
+            Iterator over the API responses
+        """
+        calls = iter(calls)
+        window = deque()
+        
+        def submit_next() -> bool:
+            call = next(calls, None)
+            if call is None:
+                return False
+            if self.async_engine:
+                future = self._get_async_client().submit(self.call_blockchain_api_async(*call, fields, cache))
+            else:
+                future = self._submit(self.call_blockchain_api, *call, fields, cache)
+            window.append((call[0], future))
+            return True
+        
+        # Keep the engine busy without materializing the whole call list
+        window_size = self.async_concurrency if self.async_engine else self.max_workers
+        for _ in range(window_size * 2):
+            if not submit_next():
+                break
+        
+        try:
+            while window:
+                endpoint, future = window.popleft()
+                submit_next()
+                try:
+                    result = wait_result(future)
+                except DeadlineExceeded:
+                    return
+                except Exception as e:
+                    if missing_ok and self._is_not_found(e):
+                        result = None
+                    elif ignore_errors:
+                        logger.warning(f"Skipping failed API call {endpoint}: {e}")
+                        result = None
+                    else:
+                        raise
+                yield result
+        finally:
+            for _, future in window:
+                future.cancel()
+    
+    @staticmethod
+    def _is_not_found(error: Exception) -> bool:
+        """Whether an API call failed with 404 Not Found, on either engine."""
+        response = getattr(error, 'response', None)
+        if getattr(response, 'status_code', None) == 404:
+            return True
+        # aiohttp's ClientResponseError carries the status itself
+        return getattr(error, 'status', None) == 404
+    
+    def _is_settled(self, height: Optional[int]) -> bool:
+        """Whether a block at the given height is buried deep enough to never change."""
+        if height is None or self.tip_height is None:
+            return False
+        return int(height) <= self.tip_height - self.cache_confirmations
+    
+    def _classify_response(self, endpoint: str, data: Any) -> Optional[str]:
+        """
+        Sort an API response into a freshness class.
+        
+        Args:
+            endpoint (str): API endpoint path
+            data: Decoded API response
+            
+        Returns:
+            Freshness class, or None if the response should not be cached
+        """
+        if not isinstance(data, dict):
+            return None
+        
+        if endpoint == '/latestblock':
+            if data.get('height') is not None:
+                self.tip_height = max(self.tip_height or 0, int(data['height']))
+            return NEAR_TIP
+        if endpoint in ('/stats', '/unconfirmed-transactions'):
+            return NEAR_TIP
+        if endpoint.startswith('/charts/'):
+            return DAILY
+        if endpoint.startswith('/rawblock/'):
+            return IMMUTABLE if self._is_settled(data.get('height')) else NEAR_TIP
+        if endpoint.startswith('/rawtx/'):
+            return IMMUTABLE if self._is_settled(data.get('block_height')) else NEAR_TIP
+        if endpoint.startswith('/block-height/'):
+            height = endpoint.rsplit('/', 1)[-1]
+            return IMMUTABLE if height.isdigit() and self._is_settled(int(height)) else NEAR_TIP
+        if endpoint.startswith('/blocks/'):
+            # A day of block summaries is complete once its last blocks are settled as well,
+            # counting ten minutes per confirmation
+            day_ms = endpoint.rsplit('/', 1)[-1]
+            if not day_ms.isdigit():
+                return NEAR_TIP
+            day_end = int(day_ms) // 1000 // 86400 * 86400 + 86400
+            return IMMUTABLE if day_end + self.cache_confirmations * 600 <= time.time() else NEAR_TIP
+        return None 
\ No newline at end of file
@@ -0,0 +1,217 @@
+import os
+import threading
+from typing import List, Optional, Dict, Sequence
+
+import numpy as np
+
+# One fixed-width record per height, the record of height h lives at offset h * itemsize.
+# Slots that were never synced have an all-zero hash.
+HEADER_DTYPE = np.dtype([
+    ('height', '<u4'),
+    ('hash', 'S32'),
+    ('prev_block', 'S32'),
+    ('time', '<u4'),
+    ('n_tx', '<u4'),
+    ('size', '<u4'),
+    ('bits', '<u4')
+])
+
+# Columns of the blocks table the index can answer on its own
+HEADER_COLUMNS = frozenset({'height', 'hash', 'prev_block', 'time', 'n_tx', 'size', 'bits'})
+
+# Block timestamps only have to exceed the median of the previous 11 blocks, so a block can
+# be older than its predecessors. Time ranges are resolved with this many blocks of margin.
+TIME_MARGIN_BLOCKS = 12
+
+# Block timestamps may run up to two hours ahead of the network time, so blocks after the
+# stored tip can have times up to this long before the tip's time
+TIME_DRIFT = 7200
+
+_GROWTH_RECORDS = 16384
+
+
+def _hash_hex(value: bytes) -> str:
+    # NumPy strips trailing NUL bytes from fixed-width bytes fields
+    return bytes(value).ljust(32, b'\0').hex()
+
+
+class HeaderIndex:
+    """
+    Persistent, memory-mapped store of block headers indexed by height.
+
+    Height lookups are direct offsets into the file, time ranges are vectorized scans and
+    hash lookups use a sorted index of hash keys that is rebuilt lazily after writes.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): File holding the records, created if missing
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._records: Optional[np.memmap] = None
+        self._hash_order: Optional[np.ndarray] = None
+        self._hash_keys: Optional[np.ndarray] = None
+
+        if not os.path.exists(path):
+            with open(path, 'wb'):
+                pass
+        self._open()
+        present = np.flatnonzero(self._present())
+        self.tip: Optional[int] = int(present[-1]) if len(present) else None
+
+    def _open(self, n_records: Optional[int] = None) -> None:
+        size = os.path.getsize(self.path)
+        if n_records is not None and n_records * HEADER_DTYPE.itemsize > size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(n_records * HEADER_DTYPE.itemsize)
+            size = n_records * HEADER_DTYPE.itemsize
+        if self._records is not None:
+            self._records.flush()
+        n_records = size // HEADER_DTYPE.itemsize
+        self._records = np.memmap(self.path, dtype=HEADER_DTYPE, mode='r+', shape=(n_records,)) if n_records else None
+
+    def _present(self) -> np.ndarray:
+        if self._records is None:
+            return np.zeros(0, dtype=bool)
+        return self._records['hash'] != b''
+
+    def __len__(self) -> int:
+        return 0 if self._records is None else len(self._records)
+
+    def has(self, height: int) -> bool:
+        """Whether the header of the given height is stored."""
+        with self._lock:
+            return 0 <= height < len(self) and self._records['hash'][height] != b''
+
+    def covers(self, lower: int, upper: int) -> bool:
+        """Whether every header from lower to upper, inclusive, is stored."""
+        with self._lock:
+            if lower < 0 or upper >= len(self) or lower > upper:
+                return False
+            return bool((self._records['hash'][lower:upper + 1] != b'').all())
+
+    def hash_at(self, height: int) -> Optional[str]:
+        """Hex hash of the block stored at the given height."""
+        with self._lock:
+            if not self.has(height):
+                return None
+            return _hash_hex(self._records['hash'][height])
+
+    def put(self, block: Dict) -> None:
+        """
+        Store the header of a main chain block, overwriting whatever was stored at its height.
+
+        Args:
+            block (dict): Block as returned by /rawblock or /block-height
+        """
+        height = int(block['height'])
+        with self._lock:
+            if height >= len(self):
+                self._open(max(height + 1, len(self) + _GROWTH_RECORDS))
+            self._records[height] = (
+                height,
+                bytes.fromhex(block['hash']),
+                bytes.fromhex(block.get('prev_block') or '00' * 32),
+                block.get('time') or 0,
+                block.get('n_tx') or 0,
+                block.get('size') or 0,
+                block.get('bits') or 0
+            )
+            self._hash_order = None
+            if self.tip is None or height > self.tip:
+                self.tip = height
+
+    def truncate_from(self, height: int) -> None:
+        """Forget every header from the given height up, e.g. after a reorg."""
+        with self._lock:
+            if height < len(self):
+                self._records[height:] = np.zeros(len(self) - height, dtype=HEADER_DTYPE)
+                self._hash_order = None
+            present = np.flatnonzero(self._present())
+            self.tip = int(present[-1]) if len(present) else None
+
+    def flush(self) -> None:
+        """Write pending changes to disk."""
+        with self._lock:
+            if self._records is not None:
+                self._records.flush()
+
+    def heights_by_time(self, min_time: Optional[int], max_time: Optional[int]) -> Optional[List[int]]:
+        """
+        Resolve a time range to heights, if the stored headers fully cover it.
+
+        Returns:
+            Ascending heights of the blocks with min_time <= time <= max_time, or None if
+            the index can't tell for certain
+        """
+        with self._lock:
+            if self._records is None:
+                return None
+            times = self._records['time']
+            mask = self._present()
+            if min_time is not None:
+                mask &= times >= min_time
+            if max_time is not None:
+                mask &= times <= max_time
+            heights = np.flatnonzero(mask)
+            if not len(heights):
+                # Can't tell a gap in the index from a range without blocks
+                return None
+            if max_time is None or max_time >= int(times[self.tip]) - TIME_DRIFT:
+                # Blocks after the stored tip may fall into the range, as the index syncs in the background
+                return None
+
+            # The neighbourhood of the range must be stored too, as block times are not monotonic
+            lower = 0 if min_time is None else max(int(heights[0]) - TIME_MARGIN_BLOCKS, 0)
+            upper = min(int(heights[-1]) + TIME_MARGIN_BLOCKS, self.tip)
+            if not self.covers(lower, upper):
+                return None
+            return [int(height) for height in heights]
+
+    def height_of(self, block_hash: str) -> Optional[int]:
+        """Height of the stored block with the given hex hash."""
+        try:
+            key = bytes.fromhex(block_hash)
+        except ValueError:
+            return None
+        if len(key) != 32:
+            return None
+
+        with self._lock:
+            if self._records is None:
+                return None
+            if self._hash_order is None:
+                # Displayed hashes start with zero bytes, so index their last 8 bytes
+                offset = HEADER_DTYPE.fields['hash'][1] + 24
+                raw = self._records.view(np.uint8).reshape(-1, HEADER_DTYPE.itemsize)
+                keys = np.ascontiguousarray(raw[:, offset:offset + 8]).view('>u8').ravel()
+                self._hash_order = np.argsort(keys, kind='stable')
+                self._hash_keys = keys[self._hash_order]
+
+            key_suffix = np.frombuffer(key[24:], dtype='>u8')[0]
+            position = int(np.searchsorted(self._hash_keys, key_suffix))
+            while position < len(self._hash_keys) and self._hash_keys[position] == key_suffix:
+                height = int(self._hash_order[position])
+                if _hash_hex(self._records['hash'][height]) == key.hex():
+                    return height
+                position += 1
+            return None
+
+    def blocks(self, heights: Sequence[int]) -> List[Dict]:
+        """Stored headers as block dicts, in the format of the API."""
+        with self._lock:
+            records = self._records[np.asarray(heights, dtype=np.int64)] if len(heights) else []
+            return [
+                {
+                    'height': int(record['height']),
+                    'hash': _hash_hex(record['hash']),
+                    'prev_block': _hash_hex(record['prev_block']),
+                    'time': int(record['time']),
+                    'n_tx': int(record['n_tx']),
+                    'size': int(record['size']),
+                    'bits': int(record['bits'])
+                }
+                for record in records
+            ]
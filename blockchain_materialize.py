@@ -0,0 +1,138 @@
+import os
+from typing import List, Optional, Iterable, Set, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
+from .blockchain_columns import INT, STRING, Schema
+
+# Tables that can be materialized, with the column holding the block height of their rows
+MATERIALIZED_TABLES = {'blocks': 'height', 'block_transactions': 'block_height'}
+
+# One row per partition touched by an export
+EXPORT_SCHEMA = {'table_name': STRING, 'first_height': INT, 'last_height': INT, 'status': STRING, 'rows': INT}
+
+
+def is_available() -> bool:
+    """Whether height ranges can be materialized, i.e. pyarrow is installed."""
+    return pa is not None
+
+
+class MaterializedStore:
+    """
+    Rows of tables for height ranges, stored as Feather (Arrow IPC) files.
+
+    Every table has a directory with one file per partition of `partition_blocks`
+    consecutive heights. Partitions are written to a temporary file and renamed once
+    complete, so an existing file is always a complete partition and an interrupted export
+    resumes at the first missing one. Files are uncompressed, so reads memory-map them and
+    only touch the columns and rows a query selects.
+    """
+
+    def __init__(self, path: str, partition_blocks: int):
+        """
+        Args:
+            path (str): Directory holding the partitions, created if missing
+            partition_blocks (int): Heights per partition
+        """
+        self.path = path
+        self.partition_blocks = max(1, partition_blocks)
+
+    def partitions(self, lower: int, upper: int) -> range:
+        """Numbers of the partitions holding the heights from lower to upper, inclusive."""
+        return range(lower // self.partition_blocks, upper // self.partition_blocks + 1)
+
+    def bounds(self, partition: int) -> Tuple[int, int]:
+        """First and last height of a partition."""
+        first = partition * self.partition_blocks
+        return first, first + self.partition_blocks - 1
+
+    def _file(self, table_name: str, partition: int) -> str:
+        first, last = self.bounds(partition)
+        return os.path.join(self.path, table_name, f'{first:010d}-{last:010d}.feather')
+
+    def has(self, table_name: str, partition: int) -> bool:
+        """Whether the partition of a table is materialized."""
+        return os.path.exists(self._file(table_name, partition))
+
+    def covers(self, table_name: str, lower: int, upper: int) -> bool:
+        """Whether every height from lower to upper, inclusive, is materialized for a table."""
+        if lower < 0 or lower > upper:
+            return False
+        return all(self.has(table_name, partition) for partition in self.partitions(lower, upper))
+
+    def write(self, table_name: str, partition: int, frames: Iterable[pd.DataFrame]) -> int:
+        """
+        Write the partition of a table from the chunks of its rows, replacing it once complete.
+
+        Returns:
+            Number of rows written, 0 if there were none and nothing was written
+        """
+        path = self._file(table_name, partition)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        n_rows = 0
+        try:
+            with pa.OSFile(temporary, 'wb') as sink:
+                schema = None
+                writer = None
+                for frame in frames:
+                    # Categories differ between chunks and an Arrow file has one dictionary per column
+                    frame = frame.astype({
+                        column: STRING for column, dtype in frame.dtypes.items()
+                        if isinstance(dtype, pd.CategoricalDtype)
+                    })
+                    chunk = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+                    if writer is None:
+                        schema = chunk.schema
+                        writer = pa.ipc.new_file(sink, schema)
+                    writer.write_table(chunk)
+                    n_rows += len(frame)
+                if writer is not None:
+                    writer.close()
+            if n_rows:
+                os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        return n_rows
+
+    def read(
+        self,
+        table_name: str,
+        schema: Schema,
+        lower: int,
+        upper: int,
+        columns: Optional[Set[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Rows with lower <= height <= upper from the memory-mapped partitions, in partition order.
+
+        Args:
+            table_name (str): Materialized table
+            schema (dict): Columns of the table with their dtypes
+            lower (int): First height
+            upper (int): Last height
+            columns (set): Columns to read, None for all; the others are left empty
+
+        Returns:
+            pd.DataFrame with every column of the schema
+        """
+        height_column = MATERIALIZED_TABLES[table_name]
+        names = [
+            column for column in schema
+            if columns is None or column in columns or column == height_column
+        ]
+        tables: List = []
+        for partition in self.partitions(lower, upper):
+            data = feather.read_table(self._file(table_name, partition), columns=names, memory_map=True)
+            heights = data[height_column]
+            tables.append(data.filter(pc.and_(pc.greater_equal(heights, lower), pc.less_equal(heights, upper))))
+        df = pa.concat_tables(tables).to_pandas()
+        return df.reindex(columns=list(schema)).astype(schema)
@@ -0,0 +1,166 @@
+import bisect
+import heapq
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Dict, Tuple
+
+import numpy as np
+
+from .blockchain_columns import transaction_aggregates, fee_rates
+
+# Lower edges of the fee rate histogram buckets in satoshis per byte, the last bucket is open-ended
+FEE_BUCKET_EDGES = (0, 1, 2, 3, 5, 8, 10, 15, 20, 30, 50, 75, 100, 150, 200, 300, 500, 1000)
+
+# Raw fields not kept in the index, their aggregates are stored instead
+_DROPPED_FIELDS = ('inputs', 'out')
+
+
+class MempoolIndex:
+    """
+    In-memory index of unconfirmed transactions, merged from /unconfirmed-transactions snapshots.
+
+    Each refresh only processes transactions it hasn't seen: their derived fields are computed
+    once, they are inserted into a fee rate sorted list and added to the fee histogram buckets.
+    Transactions leave the index when a newer snapshot covering their time no longer lists them,
+    i.e. they were confirmed or dropped, or when they exceed the maximum age.
+    """
+
+    def __init__(self, max_age: float):
+        """
+        Args:
+            max_age (float): Seconds after which transactions are evicted
+        """
+        self.max_age = max_age
+        self.refreshed_at: Optional[float] = None
+        self.lock = threading.Lock()
+
+        self._entries: Dict[str, Dict] = {}
+        self._by_fee_rate: List[Tuple[float, str]] = []
+        # Entries in ascending order of their time, for eviction proportional to churn.
+        # Entries evicted otherwise stay here until they reach the front and are skipped.
+        self._arrivals: deque = deque()
+
+        n_buckets = len(FEE_BUCKET_EDGES)
+        self.bucket_counts = np.zeros(n_buckets, dtype=np.int64)
+        self.bucket_sizes = np.zeros(n_buckets, dtype=np.int64)
+        self.bucket_fees = np.zeros(n_buckets, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def is_stale(self, max_age: float) -> bool:
+        """Whether the index was last refreshed more than max_age seconds ago."""
+        return self.refreshed_at is None or time.monotonic() - self.refreshed_at > max_age
+
+    @staticmethod
+    def _bucket(fee_rate: float) -> int:
+        return bisect.bisect_right(FEE_BUCKET_EDGES, fee_rate) - 1
+
+    def _add(self, entry: Dict) -> None:
+        tx_hash = entry['hash']
+        self._entries[tx_hash] = entry
+        bisect.insort(self._by_fee_rate, (entry['fee_per_byte'], tx_hash))
+
+        bucket = self._bucket(entry['fee_per_byte'])
+        self.bucket_counts[bucket] += 1
+        self.bucket_sizes[bucket] += entry.get('size') or 0
+        self.bucket_fees[bucket] += entry.get('fee') or 0
+
+    def _is_live(self, entry: Dict) -> bool:
+        return self._entries.get(entry['hash']) is entry
+
+    def _remove(self, entry: Dict) -> None:
+        tx_hash = entry['hash']
+        del self._entries[tx_hash]
+        position = bisect.bisect_left(self._by_fee_rate, (entry['fee_per_byte'], tx_hash))
+        del self._by_fee_rate[position]
+
+        bucket = self._bucket(entry['fee_per_byte'])
+        self.bucket_counts[bucket] -= 1
+        self.bucket_sizes[bucket] -= entry.get('size') or 0
+        self.bucket_fees[bucket] -= entry.get('fee') or 0
+
+    def merge(self, txs: List[Dict]) -> Tuple[int, int]:
+        """
+        Merge a snapshot of unconfirmed transactions.
+
+        Args:
+            txs (list): Raw transactions from /unconfirmed-transactions
+
+        Returns:
+            Tuple of (added, evicted) transaction counts
+        """
+        with_hash = [tx for tx in txs if tx.get('hash')]
+        snapshot = {tx['hash'] for tx in with_hash}
+        new_txs = [tx for tx in with_hash if tx['hash'] not in self._entries]
+        evicted = len(self._entries)
+
+        # Derived fields are computed once per transaction, in one vectorized pass over the new ones
+        aggregates = transaction_aggregates(new_txs)
+        rates = fee_rates(new_txs)
+        arrivals = []
+        for i, tx in enumerate(new_txs):
+            entry = {key: value for key, value in tx.items() if key not in _DROPPED_FIELDS}
+            entry['inputs_count'] = int(aggregates['inputs_count'][i])
+            entry['outputs_count'] = int(aggregates['outputs_count'][i])
+            entry['total_input'] = int(aggregates['total_input'][i])
+            entry['total_output'] = int(aggregates['total_output'][i])
+            entry['fee_per_byte'] = float(rates[i])
+            self._add(entry)
+            arrivals.append((entry.get('time') or 0, entry))
+
+        # The API lists the newest transactions first, arrivals are kept oldest first
+        arrivals.sort(key=lambda arrival: arrival[0])
+        if arrivals and self._arrivals and arrivals[0][0] < self._arrivals[-1][0]:
+            # Some new transactions are older than indexed ones, merge them in and drop evicted entries
+            live = (arrival for arrival in self._arrivals if self._is_live(arrival[1]))
+            self._arrivals = deque(heapq.merge(live, arrivals, key=lambda arrival: arrival[0]))
+        else:
+            self._arrivals.extend(arrivals)
+
+        # The snapshot lists everything seen since its oldest transaction, so newer entries
+        # missing from it have left the mempool. Arrivals are scanned newest first until then.
+        times = [tx.get('time') for tx in with_hash if tx.get('time') is not None]
+        if times:
+            oldest = min(times)
+            for tx_time, entry in reversed(self._arrivals):
+                if tx_time < oldest:
+                    break
+                if entry['hash'] not in snapshot and self._is_live(entry):
+                    self._remove(entry)
+
+        # Expire by age, oldest arrivals first
+        expiry = time.time() - self.max_age
+        while self._arrivals and (self._arrivals[0][0] < expiry or not self._is_live(self._arrivals[0][1])):
+            _, entry = self._arrivals.popleft()
+            if self._is_live(entry):
+                self._remove(entry)
+
+        self.refreshed_at = time.monotonic()
+        evicted = evicted + len(new_txs) - len(self._entries)
+        return len(new_txs), evicted
+
+    def transactions(self) -> List[Dict]:
+        """All indexed transactions, newest arrivals first like the API lists them."""
+        return [entry for _, entry in reversed(self._arrivals) if self._is_live(entry)]
+
+    def top_by_fee_rate(self, n: Optional[int], descending: bool = True) -> List[Dict]:
+        """The n transactions with the highest (or lowest) fee rate, all if n is None."""
+        if n is None:
+            selected = self._by_fee_rate[::-1] if descending else self._by_fee_rate
+        elif descending:
+            selected = self._by_fee_rate[max(len(self._by_fee_rate) - n, 0):][::-1] if n > 0 else []
+        else:
+            selected = self._by_fee_rate[:n]
+        return [self._entries[tx_hash] for _, tx_hash in selected]
+
+    def histogram(self) -> Dict[str, np.ndarray]:
+        """Fee rate histogram buckets with their transaction counts, sizes and fees."""
+        return {
+            'min_fee_per_byte': np.asarray(FEE_BUCKET_EDGES, dtype=np.float64),
+            'max_fee_per_byte': np.asarray(FEE_BUCKET_EDGES[1:] + (np.inf,), dtype=np.float64),
+            'tx_count': self.bucket_counts.copy(),
+            'total_size': self.bucket_sizes.copy(),
+            'total_fee': self.bucket_fees.copy()
+        }
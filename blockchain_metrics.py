@@ -0,0 +1,177 @@
+import bisect
+import functools
+import re
+import threading
+import time
+from typing import List, Optional, Dict, Callable, Tuple
+
+from mindsdb.utilities import log
+
+from .blockchain_deadline import deadline_scope
+
+logger = log.getLogger(__name__)
+
+# Upper bucket edges of duration histograms in milliseconds, the last bucket is open-ended
+DURATION_EDGES_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Upper bucket edges of size histograms in bytes
+SIZE_EDGES = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+ProfilingHook = Callable[[str, str, str, float], None]
+
+
+def endpoint_name(endpoint: str) -> str:
+    """Group endpoints by route, e.g. /rawblock/<hash> -> /rawblock, but keep chart names."""
+    if endpoint.startswith('/charts/'):
+        return endpoint
+    return '/' + endpoint.strip('/').split('/', 1)[0]
+
+
+class _Distribution:
+    """Count, total and maximum of observed values, with an optional bucketed histogram."""
+
+    __slots__ = ('edges', 'buckets', 'count', 'total', 'max')
+
+    def __init__(self, edges: Optional[Tuple[float, ...]] = None):
+        self.edges = edges
+        self.buckets = [0] * (len(edges) + 1) if edges else None
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        if self.buckets is not None:
+            self.buckets[bisect.bisect_left(self.edges, value)] += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper edge of the bucket holding the q-th percentile, capped at the maximum."""
+        if self.buckets is None or not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for i, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank and bucket:
+                return float(min(self.edges[i], self.max) if i < len(self.edges) else self.max)
+        return float(self.max)
+
+
+class HandlerMetrics:
+    """
+    Thread-safe in-process metrics of a handler.
+
+    Every observation belongs to a (scope, name, metric) series, e.g. ('endpoint', '/rawblock',
+    'latency_ms') or ('table', 'blocks', 'select_ms'). An optional profiling hook is called
+    with every observation, e.g. to forward them to an external tracing system.
+    """
+
+    def __init__(self):
+        self.hook: Optional[ProfilingHook] = None
+        self._series: Dict[Tuple[str, str, str], _Distribution] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, scope: str, name: str, metric: str, value: float = 1.0,
+                edges: Optional[Tuple[float, ...]] = None) -> None:
+        """
+        Record one observation.
+
+        Args:
+            scope (str): Kind of component, e.g. 'endpoint', 'table' or 'cache'
+            name (str): Component name, e.g. an endpoint route or a table name
+            metric (str): What is measured, with its unit as suffix where there is one
+            value (float): Observed value, 1 for plain counters
+            edges (tuple): Upper bucket edges if the series is a histogram
+        """
+        key = (scope, name, metric)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Distribution(edges)
+            series.observe(value)
+
+        hook = self.hook
+        if hook is not None:
+            try:
+                hook(scope, name, metric, value)
+            except Exception as e:
+                logger.warning(f"Profiling hook failed: {e}")
+
+    def record_request(self, endpoint: str, seconds: float, size: int, decode_seconds: float) -> None:
+        """Record a completed API request with its latency, payload size and JSON decode time."""
+        name = endpoint_name(endpoint)
+        self.observe('endpoint', name, 'latency_ms', seconds * 1000, DURATION_EDGES_MS)
+        self.observe('endpoint', name, 'response_bytes', size, SIZE_EDGES)
+        self.observe('endpoint', name, 'decode_ms', decode_seconds * 1000, DURATION_EDGES_MS)
+
+    def record_error(self, endpoint: str) -> None:
+        self.observe('endpoint', endpoint_name(endpoint), 'errors')
+
+    def record_retry(self, endpoint: str, reason: str) -> None:
+        """Record a retried request, with the status code or error that caused it."""
+        self.observe('endpoint', endpoint_name(endpoint), f'retries_{reason}')
+
+    def record_rate_limit_wait(self, seconds: float) -> None:
+        self.observe('rate_limiter', 'token_bucket', 'wait_ms', seconds * 1000, DURATION_EDGES_MS)
+
+    def record_cache(self, hit: bool, cache: str = 'response_cache') -> None:
+        self.observe('cache', cache, 'hits' if hit else 'misses')
+
+    def record_table(self, table: str, seconds: float, n_rows: int) -> None:
+        """Record a table select with its processing time and the number of rows returned."""
+        self.observe('table', table, 'select_ms', seconds * 1000, DURATION_EDGES_MS)
+        self.observe('table', table, 'rows', n_rows)
+
+    def rows(self) -> List[Dict]:
+        """One row per series, in the format of the handler_metrics table."""
+        with self._lock:
+            items = sorted(self._series.items())
+            return [
+                {
+                    'scope': scope,
+                    'name': name,
+                    'metric': metric,
+                    'count': series.count,
+                    'total': series.total,
+                    'mean': series.total / series.count if series.count else None,
+                    'p50': series.percentile(50),
+                    'p90': series.percentile(90),
+                    'p99': series.percentile(99),
+                    'max': series.max
+                }
+                for (scope, name, metric), series in items
+            ]
+
+    def reset(self) -> None:
+        """Drop all recorded observations."""
+        with self._lock:
+            self._series.clear()
+
+
+def _table_name(table) -> str:
+    # BlocksTable -> blocks, AddressTransactionsTable -> address_transactions
+    class_name = type(table).__name__
+    if class_name.endswith('Table'):
+        class_name = class_name[:-len('Table')]
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', class_name).lower()
+
+
+def timed_select(select):
+    """
+    Decorator running APITable.select under the handler's query_timeout budget, see
+    blockchain_deadline, and recording its processing time and row count in the handler's metrics.
+    """
+    @functools.wraps(select)
+    def wrapper(self, query):
+        started = time.perf_counter()
+        with deadline_scope(self.handler.query_timeout) as deadline:
+            result = select(self, query)
+        table = _table_name(self)
+        if deadline is not None and deadline.exceeded:
+            logger.warning(f"Query of {table} spent its budget of {deadline.budget:g}s, returning partial results")
+            self.handler.metrics.observe('table', table, 'partial_results')
+        self.handler.metrics.record_table(table, time.perf_counter() - started, len(result))
+        return result
+    return wrapper
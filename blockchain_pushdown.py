@@ -0,0 +1,136 @@
+import contextlib
+import contextvars
+import heapq
+from typing import List, Optional, Dict, Any, Callable, Iterable, Iterator, Set, Tuple
+
+import pandas as pd
+from mindsdb_sql_parser.ast import Identifier, Star
+from mindsdb.integrations.utilities.sql_utils import extract_comparison_conditions
+
+# Targets of the SELECT being served, as written. APIHandler.query replaces the targets passed
+# to APITable.select with *, so the handler records them here before it does.
+_selected_targets: contextvars.ContextVar = contextvars.ContextVar('blockchain_handler_targets', default=None)
+
+
+@contextlib.contextmanager
+def selected_targets(targets: Optional[List]) -> Iterator[None]:
+    """Run the select of a query with its original targets visible to QueryPushdown."""
+    token = _selected_targets.set(targets)
+    try:
+        yield
+    finally:
+        _selected_targets.reset(token)
+
+
+class QueryPushdown:
+    """
+    LIMIT, projection and ORDER BY information of a SELECT, in a form tables can act on
+    before building their DataFrames.
+    """
+
+    def __init__(self, query, columns: List[str]):
+        """
+        Args:
+            query: The SELECT query passed to APITable.select
+            columns (list): All columns of the table
+        """
+        self.columns = columns
+
+        limit = int(query.limit.value) if query.limit is not None else None
+        offset = int(query.offset.value) if getattr(query, 'offset', None) is not None else 0
+        # Rows have to be kept up to the offset, which is applied on top of the result
+        self.limit = limit + offset if limit is not None else None
+
+        self.order_by: List[Tuple[str, bool]] = []
+        for order in query.order_by or []:
+            if not isinstance(order.field, Identifier):
+                # Expressions can't be pushed down, keep everything and let MindsDB sort
+                self.order_by = []
+                self.limit = None
+                break
+            self.order_by.append((order.field.parts[-1], str(order.direction).upper() != 'DESC'))
+
+        self.required = self._required_columns(query)
+
+    def _required_columns(self, query) -> Optional[Set[str]]:
+        """Columns the query reads, or None if every column is needed."""
+        targets = _selected_targets.get()
+        if targets is None:
+            targets = query.targets
+        required = set()
+        for target in targets or []:
+            if isinstance(target, Star):
+                return None
+            if not isinstance(target, Identifier):
+                # Functions and expressions may reference any column
+                return None
+            required.add(target.parts[-1])
+
+        for _, column, _ in extract_comparison_conditions(query.where):
+            required.add(column)
+        required.update(column for column, _ in self.order_by)
+        return required
+
+    def needs(self, column: str) -> bool:
+        """Whether the query reads the given column."""
+        return self.required is None or column in self.required
+
+    def ordered_by(self, column: str) -> Optional[bool]:
+        """
+        Direction the result is ordered in if the query orders by the given column only.
+
+        Returns:
+            True for ascending, False for descending, None otherwise
+        """
+        if len(self.order_by) == 1 and self.order_by[0][0] == column:
+            return self.order_by[0][1]
+        return None
+
+    def is_enough(self, n_rows: int, natural_order: Optional[str] = None, ascending: bool = True) -> bool:
+        """
+        Whether n_rows rows produced in their natural order already satisfy the LIMIT,
+        so that pagination or fan-out can stop.
+
+        Args:
+            n_rows (int): Rows produced so far
+            natural_order (str): Column the rows are produced in order of, if any
+            ascending (bool): Direction of the natural order
+        """
+        if self.limit is None:
+            return False
+        if self.order_by and self.ordered_by(natural_order) != ascending:
+            return False
+        return n_rows >= self.limit
+
+    def top_n(self, items: Iterable[Any], sort_keys: Dict[str, Callable[[Any], Any]]) -> Optional[List[Any]]:
+        """
+        Select the LIMIT first items under the query's ORDER BY with a heap, before any row is built.
+
+        Args:
+            items: Raw API records
+            sort_keys (dict): Functions computing an ORDER BY column from a raw record
+
+        Returns:
+            The selected items in order, or None if the query can't be served this way
+        """
+        if self.limit is None or len(self.order_by) != 1:
+            return None
+        column, ascending = self.order_by[0]
+        key = sort_keys.get(column)
+        if key is None:
+            return None
+        select = heapq.nsmallest if ascending else heapq.nlargest
+        return select(self.limit, items, key=key)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Apply ORDER BY and LIMIT to a built result."""
+        order_by = [(column, ascending) for column, ascending in self.order_by if column in df.columns]
+        if order_by and len(df) > 1:
+            df = df.sort_values(
+                by=[column for column, _ in order_by],
+                ascending=[ascending for _, ascending in order_by],
+                kind='stable'
+            )
+        if self.limit is not None:
+            df = df.head(self.limit)
+        return df.reset_index(drop=True)
@@ -0,0 +1,154 @@
+import threading
+import time
+from typing import Optional, Dict
+
+import numpy as np
+
+from mindsdb.utilities import log
+
+logger = log.getLogger(__name__)
+
+# Numeric fields of /stats kept per sample. Satoshi amounts stay below 2**53, so float64 holds them exactly.
+STATS_FIELDS = (
+    'market_price_usd', 'hash_rate', 'total_fees_btc', 'n_btc_mined',
+    'n_tx', 'n_blocks_mined', 'minutes_between_blocks', 'totalbc',
+    'n_blocks_total', 'estimated_transaction_volume_usd', 'blocks_size',
+    'miners_revenue_usd', 'nextretarget', 'difficulty', 'estimated_btc_sent',
+    'miners_revenue_btc', 'total_btc_sent', 'trade_volume_btc', 'trade_volume_usd'
+)
+
+
+class StatsHistory:
+    """
+    Fixed-size ring buffer of /stats samples, one preallocated array per field.
+
+    Samples are appended in time order and the oldest one is overwritten once the buffer
+    is full. The most recent sample is also kept as is, for the stats table.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity (int): Number of samples kept
+        """
+        self.capacity = max(1, capacity)
+        self.timestamps = np.zeros(self.capacity, dtype=np.int64)
+        self.block_heights = np.zeros(self.capacity, dtype=np.int64)
+        self.values = np.full((self.capacity, len(STATS_FIELDS)), np.nan, dtype=np.float64)
+        self.latest: Optional[Dict] = None
+        self.sampled_at: Optional[float] = None
+        self.lock = threading.Lock()
+
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, stats: Dict, block_height: Optional[int] = None) -> bool:
+        """
+        Record a /stats response, unless it is the same sample as the last one.
+
+        Args:
+            stats (dict): /stats response
+            block_height (int): Height of the latest block when the sample was taken
+
+        Returns:
+            Whether the sample was new
+        """
+        # The API stamps samples in milliseconds
+        timestamp = int(stats['timestamp']) // 1000 if stats.get('timestamp') else int(time.time())
+        with self.lock:
+            self.sampled_at = time.monotonic()
+            if self._count and timestamp <= self.timestamps[(self._next - 1) % self.capacity]:
+                return False
+
+            row = self._next
+            self.timestamps[row] = timestamp
+            self.block_heights[row] = block_height if block_height is not None else -1
+            self.values[row] = [np.nan if stats.get(field) is None else stats[field] for field in STATS_FIELDS]
+            self.latest = dict(stats, timestamp=timestamp)
+
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            return True
+
+    def is_fresh(self, max_age: float) -> bool:
+        """Whether the latest sample was taken less than max_age seconds ago."""
+        return self.sampled_at is not None and time.monotonic() - self.sampled_at <= max_age
+
+    def _order(self) -> np.ndarray:
+        # Buffer rows from the oldest to the newest sample
+        if self._count < self.capacity:
+            return np.arange(self._count)
+        return (np.arange(self.capacity) + self._next) % self.capacity
+
+    def columns(self, lower: Optional[int] = None, upper: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Samples with lower <= timestamp <= upper as column arrays, oldest first.
+
+        Returns:
+            Dict with 'timestamp', 'block_height' (-1 where unknown) and one array per field of STATS_FIELDS
+        """
+        with self.lock:
+            order = self._order()
+            timestamps = self.timestamps[order]
+            first = 0 if lower is None else int(np.searchsorted(timestamps, lower, side='left'))
+            last = len(order) if upper is None else int(np.searchsorted(timestamps, upper, side='right'))
+            rows = order[first:last]
+
+            data = {'timestamp': self.timestamps[rows], 'block_height': self.block_heights[rows]}
+            values = self.values[rows]
+            for i, field in enumerate(STATS_FIELDS):
+                data[field] = values[:, i]
+            return data
+
+
+class StatsPoller:
+    """Daemon thread sampling /stats and /latestblock into a StatsHistory at a fixed interval."""
+
+    def __init__(self, handler, history: StatsHistory, interval: float):
+        """
+        Args:
+            handler: BlockchainHandler issuing the API calls
+            history (StatsHistory): Buffer the samples are appended to
+            interval (float): Seconds between samples
+        """
+        self.handler = handler
+        self.history = history
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='blockchain_handler_stats', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def poll(self) -> None:
+        """Take one sample."""
+        stats = self.handler.call_blockchain_api('/stats', {'format': 'json'})
+        latest = self.handler.call_blockchain_api('/latestblock')
+        if stats:
+            self.history.append(stats, latest.get('height') if latest else None)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning(f"Polling /stats failed: {e}")
+            self._stop.wait(max(self.interval - (time.monotonic() - started), 0))
@@ -1,385 +1,1171 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Sequence, Tuple
 from mindsdb.integrations.libs.api_handler import APITable
 from mindsdb.integrations.utilities.sql_utils import extract_comparison_conditions
 from mindsdb_sql_parser.ast import Constant
+from mindsdb.utilities import log
+import numpy as np
 import pandas as pd
+import calendar
+import itertools
+import threading
 import time
 
+from .blockchain_pushdown import QueryPushdown
+from .blockchain_columns import (
+    INT, FLOAT, BOOL, STRING, CATEGORY, DATETIME,
+    build_frame, empty_frame, typed_frame, transaction_aggregates
+)
+from .blockchain_deadline import DeadlineExceeded, check_deadline, wait_result
+from .blockchain_decode import BlockTransactionDecoder, STREAM_CHUNK_SIZE
+from .blockchain_headers import HEADER_COLUMNS
+from .blockchain_metrics import timed_select
+from .blockchain_cache import NEAR_TIP
+from .blockchain_stats import STATS_FIELDS
+
+logger = log.getLogger(__name__)
+
+
+def _range_bounds(conditions: List, column: str, equality: bool = True) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Combine range predicates on an integer column into inclusive bounds.
+    
+    Args:
+        conditions (list): Conditions from extract_comparison_conditions
+        column (str): Column to collect the bounds of
+        equality (bool): Treat = as a range of one value
+        
+    Returns:
+        Tuple of (lower, upper), None where unbounded
+    """
+    lower = None
+    upper = None
+    for op, arg1, arg2 in conditions:
+        if arg1 != column:
+            continue
+        op = op.lower()
+        low = high = None
+        if op in ('>', '>='):
+            low = int(arg2) + (1 if op == '>' else 0)
+        elif op in ('<', '<='):
+            high = int(arg2) - (1 if op == '<' else 0)
+        elif op == 'between':
+            low, high = int(arg2[0]), int(arg2[1])
+        elif op == '=' and equality:
+            low = high = int(arg2)
+        if low is not None:
+            lower = low if lower is None else max(lower, low)
+        if high is not None:
+            upper = high if upper is None else min(upper, high)
+    return lower, upper
+
+
+def _resolve_heights(handler, conditions: List, column: str = 'height') -> Optional[Sequence[int]]:
+    """
+    Expand equality, IN, range and BETWEEN predicates on a height column into an ascending sequence of heights.
+    
+    Heights above the chain tip are left out, as the API has no blocks for them.
+    Returns None if the query has no predicates on the column.
+    """
+    explicit = None
+    lower = None
+    upper = None
+    
+    for op, arg1, arg2 in conditions:
+        if arg1 != column:
+            continue
+        op = op.lower()
+        if op in ('=', 'in'):
+            values = {int(value) for value in (arg2 if isinstance(arg2, (list, tuple)) else [arg2])}
+            explicit = values if explicit is None else explicit & values
+        elif op in ('>', '>='):
+            bound = int(arg2) + (1 if op == '>' else 0)
+            lower = bound if lower is None else max(lower, bound)
+        elif op in ('<', '<='):
+            bound = int(arg2) - (1 if op == '<' else 0)
+            upper = bound if upper is None else min(upper, bound)
+        elif op == 'between':
+            low, high = int(arg2[0]), int(arg2[1])
+            lower = low if lower is None else max(lower, low)
+            upper = high if upper is None else min(upper, high)
+    
+    if explicit is None and lower is None and upper is None:
+        return None
+    
+    latest = handler.call_blockchain_api('/latestblock')
+    tip = latest.get('height') if latest else None
+    if tip is not None:
+        upper = tip if upper is None else min(upper, tip)
+    
+    if explicit is not None:
+        return sorted(
+            height for height in explicit
+            if (lower is None or height >= lower) and (upper is None or height <= upper)
+        )
+    
+    if upper is None:
+        upper = 0
+    lower = max(lower or 0, 0)
+    return range(lower, upper + 1)
+
 
 class BlocksTable(APITable):
     """Table for Bitcoin blocks data."""
     
+    # API fields per column where they differ from the column name, None if not provided
+    BLOCK_SOURCES = {'version': 'ver'}
+    # /rawblock fields backing the columns, also of the /block-height blocks, decoded without the transaction list
+    RAWBLOCK_FIELDS = frozenset({
+        'height', 'hash', 'time', 'main_chain', 'size', 'block_index', 'received_time',
+        'relayed_by', 'n_tx', 'prev_block', 'mrkl_root', 'ver', 'bits', 'nonce'
+    })
+    SUMMARY_SOURCES = {
+        'main_chain': None, 'size': None, 'block_index': None, 'received_time': None,
+        'relayed_by': None, 'n_tx': None, 'prev_block': None, 'mrkl_root': None,
+        'version': None, 'bits': None, 'nonce': None
+    }
+    LATEST_SOURCES = {
+        'main_chain': None, 'size': None, 'received_time': None, 'relayed_by': None,
+        'n_tx': None, 'prev_block': None, 'mrkl_root': None, 'version': None,
+        'bits': None, 'nonce': None
+    }
+    # `time = <value>` from this value up is a millisecond timestamp selecting a whole day
+    MS_TIMESTAMP_MIN = 10 ** 11
+    # Fields of the /block-height blocks decoded when syncing the header index
+    HEADER_SYNC_FIELDS = HEADER_COLUMNS | {'main_chain'}
+    
+    SCHEMA = {
+        'height': INT, 'hash': STRING, 'time': INT, 'main_chain': BOOL, 'size': INT, 'block_index': INT,
+        'received_time': INT, 'relayed_by': CATEGORY, 'n_tx': INT, 'prev_block': STRING, 'mrkl_root': STRING,
+        'version': INT, 'bits': INT, 'nonce': INT
+    }
+    
     def get_columns(self) -> List[str]:
-        return [
-            'height', 'hash', 'time', 'main_chain', 'size', 'block_index',
-            'received_time', 'relayed_by', 'n_tx', 'prev_block', 'mrkl_root',
-            'version', 'bits', 'nonce'
-        ]
+        return list(self.SCHEMA)
     
+    def __init__(self, handler):
+        super().__init__(handler)
+        self._last_header_sync = None
+        self._header_sync_lock = threading.Lock()
+        self._header_sync_thread: Optional[threading.Thread] = None
+    
+    @timed_select
     def select(self, query) -> pd.DataFrame:
         """Get Bitcoin blocks data."""
         conditions = extract_comparison_conditions(query.where)
+        pushdown = QueryPushdown(query, self.get_columns())
+        
+        # The local header index answers queries that only read header columns
+        index = self.handler.header_index
+        if index is not None:
+            self._start_header_sync()
+        headers_only = index is not None and pushdown.required is not None and pushdown.required <= HEADER_COLUMNS
         
         # Parse conditions
-        block_hash = None
-        block_height = None
-        time_filter = None
+        block_hashes = []
+        time_conditions = []
         
         for op, arg1, arg2 in conditions:
-            if arg1 == 'hash' and op == '=':
-                block_hash = arg2
-            elif arg1 == 'height' and op == '=':
-                block_height = arg2
-            elif arg1 == 'time' and op == '=':
-                time_filter = arg2
+            op = op.lower()
+            if arg1 == 'hash':
+                if op == '=':
+                    block_hashes = [arg2]
+                elif op == 'in':
+                    block_hashes = arg2 if isinstance(arg2, list) else [arg2]
+            elif arg1 == 'time':
+                if op == '=' and int(arg2) >= self.MS_TIMESTAMP_MIN:
+                    # Millisecond timestamps select the day they fall on, as /blocks/{ms} does
+                    day_start = int(arg2) // 1000 // 86400 * 86400
+                    time_conditions.append(['between', 'time', [day_start, day_start + 86399]])
+                else:
+                    time_conditions.append([op, arg1, arg2])
+        min_time, max_time = _range_bounds(time_conditions, 'time')
+        
+        heights = _resolve_heights(self.handler, conditions)
+        if heights is None and index is not None and (min_time is not None or max_time is not None):
+            # Time ranges resolve to heights through the header index, if it covers them
+            heights = index.heights_by_time(min_time, max_time)
         
         # Get data from API
-        if block_hash:
-            # Get specific block by hash
-            response = self.handler.call_blockchain_api(f'/rawblock/{block_hash}')
-            if response:
-                return pd.DataFrame([self._process_block_data(response)], columns=self.get_columns())
-        elif block_height:
-            # Get block by height
-            response = self.handler.call_blockchain_api(f'/block-height/{block_height}')
-            if response and 'blocks' in response:
-                rows = []
-                for block in response['blocks']:
-                    rows.append(self._process_block_data(block))
-                return pd.DataFrame(rows, columns=self.get_columns())
-        elif time_filter:
-            # Get blocks for specific time (in milliseconds)
-            response = self.handler.call_blockchain_api(f'/blocks/{time_filter}')
-            if response and 'blocks' in response:
-                rows = []
-                for block in response['blocks']:
-                    rows.append(self._process_block_summary(block))
-                return pd.DataFrame(rows, columns=self.get_columns())
+        if block_hashes:
+            unique_hashes = list(dict.fromkeys(block_hashes))
+            if headers_only:
+                local_heights = [index.height_of(block_hash) for block_hash in unique_hashes]
+                if None not in local_heights:
+                    return pushdown.apply(self._build_index_frame(sorted(local_heights)))
+            
+            # Get specific blocks by hash, deduplicated and fetched concurrently, skipping their transactions
+            calls = [(f'/rawblock/{block_hash}', None) for block_hash in unique_hashes]
+            blocks = [block for block in self.handler.fetch_many(calls, fields=self.RAWBLOCK_FIELDS) if block]
+            blocks.sort(key=lambda block: block.get('height') or -1)
+            self._index_blocks(blocks)
+            return pushdown.apply(build_frame(blocks, self.SCHEMA, self.BLOCK_SOURCES))
+        elif heights is not None:
+            # Get blocks by height, fetched concurrently and streamed in height order
+            ascending = pushdown.ordered_by('height') is not False
+            if not ascending:
+                heights = heights[::-1]
+            if pushdown.limit is not None and (not pushdown.order_by or pushdown.ordered_by('height') is not None):
+                # Every height yields at least one block, so the LIMIT bounds the fan-out
+                heights = heights[:pushdown.limit]
+            if not heights:
+                return empty_frame(self.SCHEMA)
+            lowest, highest = min(heights[0], heights[-1]), max(heights[0], heights[-1])
+            materialized = self.handler.materialized
+            if materialized is not None and materialized.covers('blocks', lowest, highest):
+                # Materialized ranges are read locally, however many blocks they span
+                df = materialized.read('blocks', self.SCHEMA, lowest, highest, pushdown.required)
+                if not isinstance(heights, range):
+                    df = df[df['height'].isin(heights)]
+                return pushdown.apply(df)
+            if headers_only and index.covers(lowest, highest):
+                return pushdown.apply(self._build_index_frame(heights))
+            if len(heights) > self.handler.max_block_range:
+                raise ValueError(
+                    f"Height range of {len(heights)} blocks spans more than {self.handler.max_block_range} blocks, "
+                    f"narrow the range or increase max_block_range"
+                )
+            
+            # Only the header fields of the blocks are decoded, their transaction lists are skipped
+            blocks = []
+            calls = ((f'/block-height/{height}', None) for height in heights)
+            # A height the tip reached after it was resolved may not be served by every API node yet
+            for response in self.handler.fetch_many(calls, fields=self.RAWBLOCK_FIELDS, missing_ok=True):
+                if response and 'blocks' in response:
+                    blocks.extend(response['blocks'])
+                if pushdown.is_enough(len(blocks), 'height', ascending):
+                    break
+            self._index_blocks(blocks)
+            return pushdown.apply(build_frame(blocks, self.SCHEMA, self.BLOCK_SOURCES))
+        elif min_time is not None or max_time is not None:
+            # Get blocks in a time range, one /blocks/{ms} partition per day
+            blocks = self._scan_days(min_time, max_time, pushdown)
+            # Summaries only list main chain blocks
+            return pushdown.apply(build_frame(blocks, self.SCHEMA, self.SUMMARY_SOURCES, computed={'main_chain': True}))
         else:
             # Get latest block
             response = self.handler.call_blockchain_api('/latestblock')
             if response:
-                return pd.DataFrame([self._process_latest_block(response)], columns=self.get_columns())
-        
-        return pd.DataFrame(columns=self.get_columns())
-    
-    def _process_block_data(self, block: Dict) -> List:
-        """Process detailed block data."""
-        return [
-            block.get('height'),
-            block.get('hash'),
-            block.get('time'),
-            block.get('main_chain'),
-            block.get('size'),
-            block.get('block_index'),
-            block.get('received_time'),
-            block.get('relayed_by'),
-            block.get('n_tx'),
-            block.get('prev_block'),
-            block.get('mrkl_root'),
-            block.get('ver'),
-            block.get('bits'),
-            block.get('nonce')
-        ]
-    
-    def _process_block_summary(self, block: Dict) -> List:
-        """Process block summary data from blocks endpoint."""
-        return [
-            block.get('height'),
-            block.get('hash'),
-            block.get('time'),
-            True,  # main_chain default
-            None,  # size not available in summary
-            None,  # block_index not available
-            None,  # received_time not available
-            None,  # relayed_by not available
-            None,  # n_tx not available
-            None,  # prev_block not available
-            None,  # mrkl_root not available
-            None,  # version not available
-            None,  # bits not available
-            None   # nonce not available
-        ]
-    
-    def _process_latest_block(self, block: Dict) -> List:
-        """Process latest block data."""
-        return [
-            block.get('height'),
-            block.get('hash'),
-            block.get('time'),
-            True,
-            None,
-            block.get('block_index'),
-            None,
-            None,
-            len(block.get('txIndexes', [])),
-            None,
-            None,
-            None,
-            None,
-            None
-        ]
+                return build_frame(
+                    [response], self.SCHEMA, self.LATEST_SOURCES,
+                    computed={'main_chain': True, 'n_tx': [len(response.get('txIndexes', []))]}
+                )
+        
+        return empty_frame(self.SCHEMA)
+    
+    def _scan_days(self, min_time: Optional[int], max_time: Optional[int], pushdown: QueryPushdown) -> List[Dict]:
+        """
+        Collect the block summaries with min_time <= time <= max_time from the /blocks/{ms} partitions of their days.
+        
+        The UTC days of the range are fetched concurrently and consumed in time order, each
+        sorted and trimmed to the range, and the scan stops once the LIMIT is reached if
+        that order satisfies the query. Completed days are cached as immutable partitions.
+        """
+        if min_time is None:
+            raise ValueError("Time ranges of blocks need a lower bound, e.g. time >= 1700000000")
+        max_time = min(max_time if max_time is not None else int(time.time()), int(time.time()))
+        first_day, last_day = max(min_time, 0) // 86400, max_time // 86400
+        if last_day < first_day:
+            return []
+        if last_day - first_day + 1 > self.handler.max_time_range_days:
+            raise ValueError(
+                f"Time range of {last_day - first_day + 1} days spans more than {self.handler.max_time_range_days} days, "
+                f"narrow the range or increase max_time_range_days"
+            )
+        
+        ascending = pushdown.ordered_by('time') is not False
+        days = range(first_day, last_day + 1) if ascending else range(last_day, first_day - 1, -1)
+        calls = ((f'/blocks/{day * 86400 * 1000}', None) for day in days)
+        
+        blocks = []
+        for response in self.handler.fetch_many(calls):
+            day_blocks = [
+                block for block in (response or {}).get('blocks', [])
+                if block.get('time') is not None and min_time <= block['time'] <= max_time
+            ]
+            day_blocks.sort(key=lambda block: (block['time'], block.get('height') or 0), reverse=not ascending)
+            blocks.extend(day_blocks)
+            if pushdown.is_enough(len(blocks), 'time', ascending):
+                break
+        return blocks
+    
+    def iter_height_frames(self, first: int, last: int) -> Iterator[pd.DataFrame]:
+        """
+        Yield every block from the first to the last height, orphans included, for materialization.
+        
+        Raises:
+            ValueError if the API returns no block for a height
+        """
+        heights = range(first, last + 1)
+        calls = ((f'/block-height/{height}', None) for height in heights)
+        blocks = []
+        for height, response in zip(heights, self.handler.fetch_many(calls, fields=self.RAWBLOCK_FIELDS)):
+            if not response or not response.get('blocks'):
+                raise ValueError(f"No block at height {height}")
+            blocks.extend(response['blocks'])
+        self._index_blocks(blocks)
+        yield build_frame(blocks, self.SCHEMA, self.BLOCK_SOURCES)
+    
+    def _build_index_frame(self, heights: Sequence[int]) -> pd.DataFrame:
+        """Build the result from headers stored in the header index."""
+        blocks = self.handler.header_index.blocks(heights)
+        return build_frame(blocks, self.SCHEMA, self.BLOCK_SOURCES, computed={'main_chain': True})
+    
+    def _index_blocks(self, blocks: List[Dict]) -> None:
+        """Write main chain blocks fetched from the API through to the header index."""
+        index = self.handler.header_index
+        if index is None:
+            return
+        for block in blocks:
+            if block.get('main_chain', True) and block.get('height') is not None and block.get('hash'):
+                index.put(block)
+        index.flush()
+    
+    @staticmethod
+    def _main_chain_block(response: Optional[Dict]) -> Optional[Dict]:
+        """Pick the main chain block of a /block-height response, which also lists orphans."""
+        blocks = response.get('blocks', []) if response else []
+        for block in blocks:
+            if block.get('main_chain', True):
+                return block
+        return None
+    
+    def _start_header_sync(self) -> None:
+        """
+        Start a sync of the header index on a background thread if one is due.
+        
+        Queries never wait for it and it runs outside their deadline. Until it completes,
+        queries the index doesn't cover go to the API.
+        """
+        with self._header_sync_lock:
+            if self._header_sync_thread is not None and self._header_sync_thread.is_alive():
+                return
+            now = time.monotonic()
+            if self._last_header_sync is not None and now - self._last_header_sync < self.handler.header_sync_interval:
+                return
+            self._last_header_sync = now
+            self._header_sync_thread = threading.Thread(
+                target=self._run_header_sync, name='blockchain_handler_header_sync', daemon=True
+            )
+            self._header_sync_thread.start()
+    
+    def _run_header_sync(self) -> None:
+        try:
+            self._sync_header_index()
+        except Exception as e:
+            # The index lags behind until the next sync, queries it can't answer go to the API
+            logger.warning(f"Syncing the header index failed: {e}")
+    
+    def _sync_header_index(self) -> None:
+        """
+        Bring the header index up to the chain tip.
+        
+        Syncs from the last stored height, at most header_sync_depth blocks back from the tip,
+        and repairs reorgs detected through prev_block mismatches. Only the header fields of
+        the blocks are decoded, and the responses are not cached.
+        """
+        index = self.handler.header_index
+        latest = self.handler.call_blockchain_api('/latestblock')
+        if not latest or latest.get('height') is None:
+            return
+        tip = int(latest['height'])
+        
+        if index.tip is not None and index.tip > tip:
+            # A reorg shortened the chain, the headers above the new tip are stale
+            logger.info(f"Chain tip moved back from {index.tip} to {tip}, dropping the headers above it")
+            index.truncate_from(tip + 1)
+        
+        start = tip - self.handler.header_sync_depth + 1
+        if index.tip is not None:
+            start = max(start, index.tip + 1)
+            if index.tip >= tip and index.hash_at(tip) != latest.get('hash'):
+                # The stored tip was replaced
+                start = tip
+        
+        calls = ((f'/block-height/{height}', None) for height in range(max(start, 0), tip + 1))
+        for response in self.handler.fetch_many(calls, fields=self.HEADER_SYNC_FIELDS, cache=False):
+            block = self._main_chain_block(response)
+            if block is None:
+                continue
+            height = int(block['height'])
+            if index.has(height - 1) and index.hash_at(height - 1) != block.get('prev_block'):
+                self._repair_reorg(height - 1)
+            index.put(block)
+        index.flush()
+    
+    def _repair_reorg(self, height: int) -> None:
+        """Replace stored headers from the given height down until the stored chain matches the main chain."""
+        index = self.handler.header_index
+        logger.info(f"Reorg detected in the header index below height {height + 1}")
+        while height >= 0 and index.has(height):
+            block = self._main_chain_block(self.handler.call_blockchain_api(
+                f'/block-height/{height}', fields=self.HEADER_SYNC_FIELDS, cache=False
+            ))
+            if block is None or block.get('hash') == index.hash_at(height):
+                break
+            index.put(block)
+            height -= 1
 
 
 class TransactionsTable(APITable):
     """Table for Bitcoin transactions data."""
     
+    # API fields per column where they differ from the column name
+    SOURCES = {'version': 'ver'}
+    
+    # Newest unconfirmed transactions returned without a hash predicate, ORDER BY or LIMIT
+    DEFAULT_MEMPOOL_ROWS = 50
+    
+    # ORDER BY columns that can be computed from a raw transaction for top-N selection
+    SORT_KEYS = {
+        'fee': lambda tx: tx.get('fee') or 0,
+        'size': lambda tx: tx.get('size') or 0,
+        'time': lambda tx: tx.get('time') or 0,
+        'vin_sz': lambda tx: tx.get('vin_sz') or 0,
+        'vout_sz': lambda tx: tx.get('vout_sz') or 0
+    }
+    
+    SCHEMA = {
+        'hash': STRING, 'size': INT, 'block_height': INT, 'block_index': INT, 'time': INT, 'tx_index': INT,
+        'version': INT, 'lock_time': INT, 'vin_sz': INT, 'vout_sz': INT, 'fee': INT, 'relayed_by': CATEGORY,
+        'inputs_count': INT, 'outputs_count': INT, 'total_input': INT, 'total_output': INT
+    }
+    
     def get_columns(self) -> List[str]:
-        return [
-            'hash', 'size', 'block_height', 'block_index', 'time', 'tx_index',
-            'version', 'lock_time', 'vin_sz', 'vout_sz', 'fee', 'relayed_by',
-            'inputs_count', 'outputs_count', 'total_input', 'total_output'
-        ]
+        return list(self.SCHEMA)
     
+    @timed_select
     def select(self, query) -> pd.DataFrame:
         """Get Bitcoin transactions data."""
         conditions = extract_comparison_conditions(query.where)
+        pushdown = QueryPushdown(query, self.get_columns())
         
         # Parse conditions
-        tx_hash = None
+        tx_hashes = None
         
         for op, arg1, arg2 in conditions:
-            if arg1 == 'hash' and op == '=':
-                tx_hash = arg2
+            op = op.lower()
+            if arg1 == 'hash':
+                if op == '=':
+                    tx_hashes = [arg2]
+                elif op == 'in':
+                    tx_hashes = arg2 if isinstance(arg2, list) else [arg2]
         
-        if tx_hash:
-            # Get specific transaction
-            response = self.handler.call_blockchain_api(f'/rawtx/{tx_hash}')
-            if response:
-                return pd.DataFrame([self._process_transaction_data(response)], columns=self.get_columns())
+        if tx_hashes is not None:
+            # Get specific transactions, deduplicated and fetched concurrently
+            unique_hashes = list(dict.fromkeys(tx_hashes))
+            calls = [(f'/rawtx/{tx_hash}', None) for tx_hash in unique_hashes]
+            txs = []
+            missing = []
+            n_fetched = 0
+            # Only unknown hashes count as missing, any other failure fails the query
+            for tx_hash, response in zip(unique_hashes, self.handler.fetch_many(calls, missing_ok=True)):
+                n_fetched += 1
+                if response:
+                    txs.append(response)
+                else:
+                    missing.append(tx_hash)
+            if missing:
+                logger.warning(f"{len(missing)} of {len(unique_hashes)} transactions not found: {', '.join(missing)}")
+            unfetched = unique_hashes[n_fetched:]
+            if unfetched:
+                # The query's budget was spent before these were fetched
+                logger.warning(
+                    f"{len(unfetched)} of {len(unique_hashes)} transactions not fetched within the query budget: "
+                    f"{', '.join(unfetched)}"
+                )
+            return pushdown.apply(self._build_frame(txs, pushdown))
+        else:
+            # Get unconfirmed transactions from the mempool index as default
+            mempool = self.handler.refresh_mempool()
+            with mempool.lock:
+                entries = mempool.transactions()
+            txs = pushdown.top_n(entries, self.SORT_KEYS)
+            if txs is None:
+                txs = entries if pushdown.order_by else entries[:pushdown.limit or self.DEFAULT_MEMPOOL_ROWS]
+            # Index entries carry their precomputed counts and totals
+            return pushdown.apply(build_frame(txs, self.SCHEMA, self.SOURCES))
+    
+    def _build_frame(self, txs: List[Dict], pushdown: Optional[QueryPushdown] = None) -> pd.DataFrame:
+        """Build the result from raw transactions, computing the totals only if the query reads them."""
+        need_input = pushdown is None or pushdown.needs('total_input')
+        need_output = pushdown is None or pushdown.needs('total_output')
+        aggregates = transaction_aggregates(txs, total_input=need_input, total_output=need_output)
+        return build_frame(txs, self.SCHEMA, self.SOURCES, computed={
+            'inputs_count': aggregates['inputs_count'],
+            'outputs_count': aggregates['outputs_count'],
+            'total_input': aggregates.get('total_input'),
+            'total_output': aggregates.get('total_output')
+        })
+
+
+class BlockTransactionsTable(APITable):
+    """
+    Table for the transactions inside blocks.
+    
+    Blocks are streamed and their transaction lists decoded one transaction at a time, so
+    memory is bounded by the chunk size rather than the block size.
+    """
+    
+    # API fields per column where they differ from the column name
+    SOURCES = {'version': 'ver'}
+    
+    # Block fields paired with every transaction of the block
+    BLOCK_FIELDS = frozenset({'hash', 'height', 'time'})
+    
+    # The block hash repeats on every transaction of the block, so it is a categorical
+    SCHEMA = {
+        'block_hash': CATEGORY, 'block_height': INT, 'block_time': INT, 'tx_position': INT, 'hash': STRING,
+        'size': INT, 'weight': INT, 'time': INT, 'tx_index': INT, 'version': INT, 'lock_time': INT,
+        'vin_sz': INT, 'vout_sz': INT, 'fee': INT, 'relayed_by': CATEGORY,
+        'inputs_count': INT, 'outputs_count': INT, 'total_input': INT, 'total_output': INT
+    }
+    
+    def get_columns(self) -> List[str]:
+        return list(self.SCHEMA)
+    
+    @timed_select
+    def select(self, query) -> pd.DataFrame:
+        """Get the transactions of Bitcoin blocks."""
+        pushdown = QueryPushdown(query, self.get_columns())
+        frames = list(self.iter_chunks(query, pushdown))
+        if not frames:
+            return empty_frame(self.SCHEMA)
+        # Categories differ between chunks, so they are merged again after concatenating
+        return pushdown.apply(pd.concat(frames, ignore_index=True).astype(self.SCHEMA))
+    
+    def iter_chunks(self, query, pushdown: Optional[QueryPushdown] = None) -> Iterator[pd.DataFrame]:
+        """
+        Yield the transactions selected by a query as DataFrames of at most block_tx_chunk_size rows.
+        
+        Blocks are produced in height order, or in the order of the requested hashes, and
+        streaming stops as soon as the LIMIT is reached if that order satisfies the query.
+        """
+        conditions = extract_comparison_conditions(query.where)
+        pushdown = pushdown or QueryPushdown(query, self.get_columns())
+        
+        # Parse conditions
+        block_hashes = None
+        
+        for op, arg1, arg2 in conditions:
+            op = op.lower()
+            if arg1 == 'block_hash':
+                if op == '=':
+                    block_hashes = [arg2]
+                elif op == 'in':
+                    block_hashes = arg2 if isinstance(arg2, list) else [arg2]
+        
+        # Blocks requested by hash stream in request order, which is not a height order
+        natural_order = None
+        ascending = True
+        if block_hashes is not None:
+            calls = [(f'/rawblock/{block_hash}', None) for block_hash in dict.fromkeys(block_hashes)]
         else:
-            # Get unconfirmed transactions as default
-            response = self.handler.call_blockchain_api('/unconfirmed-transactions')
-            if response and 'txs' in response:
-                rows = []
-                for tx in response['txs'][:50]:  # Limit to 50 transactions
-                    rows.append(self._process_transaction_data(tx))
-                return pd.DataFrame(rows, columns=self.get_columns())
-        
-        return pd.DataFrame(columns=self.get_columns())
-    
-    def _process_transaction_data(self, tx: Dict) -> List:
-        """Process transaction data."""
-        inputs = tx.get('inputs', [])
-        outputs = tx.get('out', [])
-        
-        total_input = sum(float(inp.get('prev_out', {}).get('value', 0)) for inp in inputs if inp.get('prev_out'))
-        total_output = sum(float(out.get('value', 0)) for out in outputs)
-        
-        return [
-            tx.get('hash'),
-            tx.get('size'),
-            tx.get('block_height'),
-            tx.get('block_index'),
-            tx.get('time'),
-            tx.get('tx_index'),
-            tx.get('ver'),
-            tx.get('lock_time'),
-            tx.get('vin_sz'),
-            tx.get('vout_sz'),
-            tx.get('fee'),
-            tx.get('relayed_by'),
-            len(inputs),
-            len(outputs),
-            total_input,
-            total_output
-        ]
+            natural_order = 'block_height'
+            heights = _resolve_heights(self.handler, conditions, 'block_height')
+            if heights is None:
+                raise ValueError("Filter block_transactions by block_hash or block_height")
+            ascending = pushdown.ordered_by('block_height') is not False
+            if not ascending:
+                heights = heights[::-1]
+            materialized = self.handler.materialized
+            if heights and materialized is not None:
+                lowest, highest = min(heights[0], heights[-1]), max(heights[0], heights[-1])
+                if materialized.covers('block_transactions', lowest, highest):
+                    yield from self._iter_materialized(heights, lowest, highest, ascending, pushdown)
+                    return
+            if len(heights) > self.handler.max_block_range:
+                raise ValueError(
+                    f"Height range of {len(heights)} blocks spans more than {self.handler.max_block_range} blocks, "
+                    f"narrow the range or increase max_block_range"
+                )
+            calls = [(f'/block-height/{height}', None) for height in heights]
+        
+        chunk_size = self.handler.block_tx_chunk_size
+        n_rows = 0
+        chunk = []
+        try:
+            for item in self._iter_transactions(calls):
+                chunk.append(item)
+                enough = pushdown.is_enough(n_rows + len(chunk), natural_order, ascending)
+                if len(chunk) >= chunk_size or enough:
+                    n_rows += len(chunk)
+                    yield self._build_frame(chunk, pushdown)
+                    chunk = []
+                if enough:
+                    return
+        except DeadlineExceeded:
+            # The query's budget is spent, the transactions decoded so far are returned
+            pass
+        if chunk:
+            yield self._build_frame(chunk, pushdown)
+    
+    def _iter_materialized(
+        self,
+        heights: Sequence[int],
+        lowest: int,
+        highest: int,
+        ascending: bool,
+        pushdown: QueryPushdown
+    ) -> Iterator[pd.DataFrame]:
+        """Yield the transactions of materialized heights in chunks, in the order iter_chunks streams blocks."""
+        df = self.handler.materialized.read('block_transactions', self.SCHEMA, lowest, highest, pushdown.required)
+        if not isinstance(heights, range):
+            df = df[df['block_height'].isin(heights)]
+        if not ascending:
+            # Blocks in descending order, the transactions of each block keeping their order
+            df = df.sort_values('block_height', ascending=False, kind='stable')
+        chunk_size = self.handler.block_tx_chunk_size
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size].reset_index(drop=True)
+            if pushdown.is_enough(start + chunk_size, 'block_height', ascending):
+                return
+    
+    def iter_height_frames(self, first: int, last: int) -> Iterator[pd.DataFrame]:
+        """Yield the transactions of every block from the first to the last height in chunks, for materialization."""
+        calls = [(f'/block-height/{height}', None) for height in range(first, last + 1)]
+        chunk_size = self.handler.block_tx_chunk_size
+        chunk = []
+        for item in self._iter_transactions(calls):
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                yield self._build_frame(chunk)
+                chunk = []
+        if chunk:
+            yield self._build_frame(chunk)
+    
+    def _iter_transactions(self, calls: List[Tuple[str, Optional[Dict]]]) -> Iterator[Tuple[Dict, int, Dict]]:
+        """
+        Stream the blocks of the calls one after another, yielding (block, position, transaction).
+        
+        The request for the next block is sent while the current one is decoded.
+        """
+        pending = [self.handler.prefetch_stream(*call) for call in calls[:2]]
+        next_call = len(pending)
+        try:
+            while pending:
+                endpoint = calls[next_call - len(pending)][0]
+                response = wait_result(pending[0])
+                pending.pop(0)
+                if next_call < len(calls):
+                    pending.append(self.handler.prefetch_stream(*calls[next_call]))
+                    next_call += 1
+                
+                container = 'blocks' if endpoint.startswith('/block-height/') else None
+                decoder = BlockTransactionDecoder(self.BLOCK_FIELDS, container)
+                block = None
+                position = 0
+                try:
+                    # None marks the end of the payload
+                    for data in itertools.chain(response.iter_content(chunk_size=STREAM_CHUNK_SIZE), [None]):
+                        check_deadline(f'decoding {endpoint}')
+                        if data is None:
+                            decoder.finish()
+                        else:
+                            decoder.feed(data)
+                        for tx_block, tx in decoder.take():
+                            if tx_block is not block:
+                                block, position = tx_block, 0
+                            yield block, position, tx
+                            position += 1
+                finally:
+                    response.close()
+        finally:
+            for future in pending:
+                if not future.cancel() and future.exception() is None:
+                    future.result().close()
+    
+    def _build_frame(self, items: List[Tuple[Dict, int, Dict]], pushdown: Optional[QueryPushdown] = None) -> pd.DataFrame:
+        """Build a chunk from (block, position, transaction) items, leaving columns the query doesn't read empty."""
+        txs = [tx for _, _, tx in items]
+        aggregates = transaction_aggregates(
+            txs,
+            total_input=pushdown is None or pushdown.needs('total_input'),
+            total_output=pushdown is None or pushdown.needs('total_output')
+        )
+        sources = dict(self.SOURCES)
+        if pushdown is not None:
+            sources.update({column: None for column in self.get_columns() if not pushdown.needs(column)})
+        return build_frame(txs, self.SCHEMA, sources, computed={
+            'block_hash': [block.get('hash') for block, _, _ in items],
+            'block_height': [block.get('height') for block, _, _ in items],
+            'block_time': [block.get('time') for block, _, _ in items],
+            'tx_position': [position for _, position, _ in items],
+            'inputs_count': aggregates['inputs_count'],
+            'outputs_count': aggregates['outputs_count'],
+            'total_input': aggregates.get('total_input'),
+            'total_output': aggregates.get('total_output')
+        })
 
 
 class AddressesTable(APITable):
     """Table for Bitcoin address data."""
     
+    # Fields not provided by /multiaddr; n_unredeemed is only there if filled in from /rawaddr
+    MULTIADDR_SOURCES = {'first_tx_time': None, 'last_tx_time': None}
+    # Top-level /multiaddr and /rawaddr fields read, skipping the transaction lists
+    MULTIADDR_FIELDS = frozenset({'addresses'})
+    UNREDEEMED_FIELDS = frozenset({'address', 'n_unredeemed'})
+    # Longest `active` parameter sent, which keeps request URLs well within common limits
+    MAX_ACTIVE_LENGTH = 6000
+    # Approximate size of a cached /multiaddr address entry, for the cache's byte budget
+    ENTRY_SIZE = 256
+    
+    SCHEMA = {
+        'address': STRING, 'hash160': STRING, 'n_tx': INT, 'n_unredeemed': INT, 'total_received': INT,
+        'total_sent': INT, 'final_balance': INT, 'first_tx_time': INT, 'last_tx_time': INT
+    }
+    
     def get_columns(self) -> List[str]:
-        return [
-            'address', 'hash160', 'n_tx', 'n_unredeemed', 'total_received',
-            'total_sent', 'final_balance', 'first_tx_time', 'last_tx_time'
-        ]
+        return list(self.SCHEMA)
     
+    @timed_select
     def select(self, query) -> pd.DataFrame:
         """Get Bitcoin address data."""
         conditions = extract_comparison_conditions(query.where)
+        pushdown = QueryPushdown(query, self.get_columns())
         
         # Parse conditions
         address = None
         addresses = []
         
         for op, arg1, arg2 in conditions:
+            op = op.lower()
             if arg1 == 'address':
                 if op == '=':
                     address = arg2
-                elif op == 'IN':
+                elif op == 'in':
                     addresses = arg2 if isinstance(arg2, list) else [arg2]
         
         if address:
             # Get single address data
             response = self.handler.call_blockchain_api(f'/rawaddr/{address}')
             if response:
-                return pd.DataFrame([self._process_address_data(response)], columns=self.get_columns())
+                times = [tx['time'] for tx in response.get('txs', []) if tx.get('time') is not None]
+                return pushdown.apply(build_frame([response], self.SCHEMA, computed={
+                    'first_tx_time': min(times) if times else None,
+                    'last_tx_time': max(times) if times else None
+                }))
         elif addresses:
-            # Get multiple addresses data
-            address_str = '|'.join(addresses)
-            response = self.handler.call_blockchain_api(f'/multiaddr', {'active': address_str})
-            if response and 'addresses' in response:
-                rows = []
-                for addr_data in response['addresses']:
-                    rows.append(self._process_multiaddr_data(addr_data))
-                return pd.DataFrame(rows, columns=self.get_columns())
-        
-        return pd.DataFrame(columns=self.get_columns())
-    
-    def _process_address_data(self, addr: Dict) -> List:
-        """Process single address data."""
-        transactions = addr.get('txs', [])
-        first_tx_time = min(tx.get('time', float('inf')) for tx in transactions) if transactions else None
-        last_tx_time = max(tx.get('time', 0) for tx in transactions) if transactions else None
-        
-        return [
-            addr.get('address'),
-            addr.get('hash160'),
-            addr.get('n_tx'),
-            addr.get('n_unredeemed'),
-            addr.get('total_received'),
-            addr.get('total_sent'),
-            addr.get('final_balance'),
-            first_tx_time if first_tx_time != float('inf') else None,
-            last_tx_time if last_tx_time != 0 else None
-        ]
-    
-    def _process_multiaddr_data(self, addr: Dict) -> List:
-        """Process multi-address data."""
-        return [
-            addr.get('address'),
-            addr.get('hash160'),
-            addr.get('n_tx'),
-            None,  # n_unredeemed not available in multiaddr
-            addr.get('total_received'),
-            addr.get('total_sent'),
-            addr.get('final_balance'),
-            None,  # first_tx_time not available
-            None   # last_tx_time not available
-        ]
+            # Get multiple addresses data, in the order of the list
+            unique_addresses = list(dict.fromkeys(addresses))
+            entries = self._fetch_entries(unique_addresses)
+            if self.handler.address_fill_unredeemed and pushdown.needs('n_unredeemed'):
+                self._fill_unredeemed(entries)
+            records = [entries[address] for address in unique_addresses if address in entries]
+            return pushdown.apply(build_frame(records, self.SCHEMA, self.MULTIADDR_SOURCES))
+        
+        return empty_frame(self.SCHEMA)
+    
+    @staticmethod
+    def _entry_key(address: str) -> Tuple:
+        return '/multiaddr#address', address
+    
+    def _fetch_entries(self, addresses: List[str]) -> Dict[str, Dict]:
+        """
+        Get the /multiaddr entries of addresses, reusing cached entries that are still fresh.
+        
+        Missing addresses are requested in chunks of at most multiaddr_chunk_size addresses,
+        which run concurrently under the rate limiter. Entries are cached per address, so
+        later lists overlapping this one only request the addresses not seen recently.
+        """
+        cache = self.handler.cache
+        entries = {}
+        missing = []
+        for address in addresses:
+            hit, entry = cache.get(self._entry_key(address))
+            if hit:
+                entries[address] = entry
+            else:
+                missing.append(address)
+        if not missing:
+            return entries
+        
+        calls = [('/multiaddr', {'active': '|'.join(chunk)}) for chunk in self._chunks(missing)]
+        for response in self.handler.fetch_many(calls, fields=self.MULTIADDR_FIELDS):
+            for entry in (response or {}).get('addresses', []):
+                if entry.get('address') is None:
+                    continue
+                entries[entry['address']] = entry
+                cache.put(self._entry_key(entry['address']), entry, self.ENTRY_SIZE, NEAR_TIP)
+        return entries
+    
+    def _chunks(self, addresses: List[str]) -> Iterator[List[str]]:
+        """Split addresses into chunks bounded by multiaddr_chunk_size and MAX_ACTIVE_LENGTH."""
+        chunk_size = max(1, self.handler.multiaddr_chunk_size)
+        chunk = []
+        length = 0
+        for address in addresses:
+            if chunk and (len(chunk) >= chunk_size or length + len(address) + 1 > self.MAX_ACTIVE_LENGTH):
+                yield chunk
+                chunk = []
+                length = 0
+            chunk.append(address)
+            length += len(address) + 1
+        if chunk:
+            yield chunk
+    
+    def _fill_unredeemed(self, entries: Dict[str, Dict]) -> None:
+        """Fill n_unredeemed, which /multiaddr doesn't provide, from the header fields of /rawaddr."""
+        addresses = [address for address, entry in entries.items() if entry.get('n_unredeemed') is None]
+        calls = [(f'/rawaddr/{address}', {'limit': 1}) for address in addresses]
+        responses = self.handler.fetch_many(calls, ignore_errors=True, fields=self.UNREDEEMED_FIELDS)
+        for address, response in zip(addresses, responses):
+            if response and response.get('n_unredeemed') is not None:
+                # Cached entries are shared, so they are replaced rather than updated
+                entries[address] = dict(entries[address], n_unredeemed=response['n_unredeemed'])
+                self.handler.cache.put(self._entry_key(address), entries[address], self.ENTRY_SIZE, NEAR_TIP)
+
+
+class AddressTransactionsTable(APITable):
+    """Table for the transaction history of Bitcoin addresses, paged through /rawaddr."""
+    
+    SCHEMA = {
+        'address': CATEGORY, 'hash': STRING, 'time': INT, 'block_height': INT, 'block_index': INT, 'tx_index': INT,
+        'size': INT, 'fee': INT, 'result': INT, 'balance': INT, 'vin_sz': INT, 'vout_sz': INT
+    }
+    
+    def get_columns(self) -> List[str]:
+        return list(self.SCHEMA)
+    
+    @timed_select
+    def select(self, query) -> pd.DataFrame:
+        """Get the transaction history of Bitcoin addresses."""
+        conditions = extract_comparison_conditions(query.where)
+        pushdown = QueryPushdown(query, self.get_columns())
+        
+        # Parse conditions
+        addresses = []
+        
+        for op, arg1, arg2 in conditions:
+            op = op.lower()
+            if arg1 == 'address':
+                if op == '=':
+                    addresses = [arg2]
+                elif op == 'in':
+                    addresses = arg2 if isinstance(arg2, list) else [arg2]
+        
+        min_time, max_time = _range_bounds(conditions, 'time')
+        
+        txs = []
+        tx_addresses = []
+        for address in dict.fromkeys(addresses):
+            address_start = len(txs)
+            for tx in self._iter_transactions(address, min_time):
+                tx_time = tx.get('time')
+                if max_time is not None and tx_time is not None and tx_time > max_time:
+                    continue
+                if min_time is not None and tx_time is not None and tx_time < min_time:
+                    # History is ordered newest first, nothing older can match
+                    break
+                txs.append(tx)
+                tx_addresses.append(address)
+                if pushdown.is_enough(len(txs)):
+                    break
+                # Each history is produced newest first, so its paging can stop at the LIMIT
+                if pushdown.is_enough(len(txs) - address_start, 'time', ascending=False):
+                    break
+            if pushdown.is_enough(len(txs)):
+                break
+        
+        return pushdown.apply(build_frame(txs, self.SCHEMA, computed={'address': tx_addresses}))
+    
+    def _iter_transactions(self, address: str, min_time: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Page through the history of an address, newest first.
+        
+        The next page is requested while the current one is consumed, unless the current
+        page already reaches past min_time or the end of the history.
+        """
+        page_size = self.handler.address_page_size
+        endpoint = f'/rawaddr/{address}'
+        offset = 0
+        future = self.handler.prefetch(endpoint, {'limit': page_size, 'offset': offset})
+        
+        try:
+            while future is not None:
+                try:
+                    response = wait_result(future)
+                except DeadlineExceeded:
+                    # The query's budget is spent, the pages read so far are returned
+                    return
+                future = None
+                txs = response.get('txs', []) if response else []
+                offset += page_size
+                
+                oldest_time = txs[-1].get('time') if txs else None
+                exhausted = len(txs) < page_size or offset >= ((response or {}).get('n_tx') or 0)
+                past_window = min_time is not None and oldest_time is not None and oldest_time < min_time
+                if not exhausted and not past_window:
+                    future = self.handler.prefetch(endpoint, {'limit': page_size, 'offset': offset})
+                
+                yield from txs
+        finally:
+            if future is not None:
+                future.cancel()
 
 
 class ChartsTable(APITable):
     """Table for Bitcoin charts and statistics data."""
     
+    SCHEMA = {
+        'chart_type': CATEGORY, 'timestamp': INT, 'value': FLOAT, 'date': DATETIME
+    }
+    
     def get_columns(self) -> List[str]:
-        return [
-            'chart_type', 'timestamp', 'value', 'date'
-        ]
+        return list(self.SCHEMA)
     
+    @timed_select
     def select(self, query) -> pd.DataFrame:
         """Get Bitcoin charts data."""
         conditions = extract_comparison_conditions(query.where)
+        pushdown = QueryPushdown(query, self.get_columns())
         
         # Parse conditions
         chart_type = 'market-price'  # Default chart type
+        rolling_average = None
+        sampled = None
         
         for op, arg1, arg2 in conditions:
+            op = op.lower()
             if arg1 == 'chart_type' and op == '=':
                 chart_type = arg2
+            elif arg1 == 'rolling_average' and op == '=':
+                rolling_average = arg2
+            elif arg1 == 'sampled' and op == '=':
+                sampled = str(arg2).lower() in ('true', '1')
         
-        # Get data from API
-        response = self.handler.call_blockchain_api(f'/charts/{chart_type}', {'format': 'json'})
-        
-        if response and 'values' in response:
-            rows = []
-            for point in response['values']:
-                rows.append([
-                    chart_type,
-                    point.get('x'),
-                    point.get('y'),
-                    time.strftime('%Y-%m-%d', time.gmtime(point.get('x', 0)))
-                ])
-            return pd.DataFrame(rows, columns=self.get_columns())
-        
-        return pd.DataFrame(columns=self.get_columns())
+        lower, upper = self._time_bounds(conditions)
+        
+        # Serve from the local series, fetching only the points it is missing
+        series = self.handler.chart_series.get(chart_type, rolling_average, sampled)
+        with series.lock:
+            if not series.covers(lower):
+                points = self._fetch_points(chart_type, rolling_average, sampled, lower, series.start)
+                series.merge(points, start=lower)
+            elif series.is_stale(self.handler.charts_refresh_interval):
+                # The cached response of the same window would hide the points added since
+                points = self._fetch_points(chart_type, rolling_average, sampled, series.last_timestamp, cache=False)
+                series.merge(points)
+            timestamps, values = series.slice(lower, upper)
+        
+        return pushdown.apply(typed_frame({
+            'chart_type': pd.Categorical.from_codes(np.zeros(len(timestamps), dtype=np.int8), [chart_type]),
+            'timestamp': timestamps,
+            'value': values,
+            'date': pd.to_datetime(timestamps, unit='s').normalize()
+        }, self.SCHEMA))
+    
+    def _fetch_points(
+        self,
+        chart_type: str,
+        rolling_average: Optional[str],
+        sampled: Optional[bool],
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        cache: bool = True
+    ) -> List[Dict]:
+        """
+        Fetch the points of a chart, pushing the time window down as API parameters.
+        
+        Args:
+            chart_type (str): Chart name
+            rolling_average (str): Averaging window, e.g. '8hours'
+            sampled (bool): Whether the API may downsample the series
+            start (int): Unix timestamp of the first point, None for the API's default window
+            end (int): Unix timestamp of the last point, None for now
+            cache (bool): Serve the call from the response cache
+        """
+        params = {'format': 'json'}
+        if start is not None:
+            end = end if end is not None else int(time.time())
+            params['start'] = time.strftime('%Y-%m-%d', time.gmtime(start))
+            params['timespan'] = f'{max(end - start, 0) // 86400 + 2}days'
+        if rolling_average:
+            params['rollingAverage'] = rolling_average
+        if sampled is not None:
+            params['sampled'] = 'true' if sampled else 'false'
+        
+        response = self.handler.call_blockchain_api(f'/charts/{chart_type}', params, cache=cache)
+        return response.get('values', []) if response else []
+    
+    @staticmethod
+    def _time_bounds(conditions: List) -> Tuple[Optional[int], Optional[int]]:
+        """Combine predicates on timestamp and date into inclusive Unix timestamp bounds."""
+        lower, upper = _range_bounds(conditions, 'timestamp')
+        
+        for op, arg1, arg2 in conditions:
+            if arg1 != 'date':
+                continue
+            op = op.lower()
+            days = [arg2[0], arg2[1]] if op == 'between' else [arg2]
+            day_starts = [calendar.timegm(time.strptime(str(day)[:10], '%Y-%m-%d')) for day in days]
+            low = high = None
+            if op == '>=':
+                low = day_starts[0]
+            elif op == '>':
+                low = day_starts[0] + 86400
+            elif op == '<=':
+                high = day_starts[0] + 86399
+            elif op == '<':
+                high = day_starts[0] - 1
+            elif op == '=':
+                low, high = day_starts[0], day_starts[0] + 86399
+            elif op == 'between':
+                low, high = day_starts[0], day_starts[1] + 86399
+            if low is not None:
+                lower = low if lower is None else max(lower, low)
+            if high is not None:
+                upper = high if upper is None else min(upper, high)
+        return lower, upper
+
+
+# Satoshi amounts and counts among the /stats fields, the others are prices, rates and volumes
+_STATS_INTEGER_FIELDS = frozenset({
+    'total_fees_btc', 'n_btc_mined', 'n_tx', 'n_blocks_mined', 'totalbc', 'n_blocks_total',
+    'blocks_size', 'nextretarget', 'estimated_btc_sent', 'total_btc_sent'
+})
+STATS_SCHEMA = {field: INT if field in _STATS_INTEGER_FIELDS else FLOAT for field in STATS_FIELDS}
 
 
 class StatsTable(APITable):
     """Table for Bitcoin network statistics."""
     
+    SCHEMA = {**STATS_SCHEMA, 'timestamp': INT}
+    
     def get_columns(self) -> List[str]:
-        return [
-            'market_price_usd', 'hash_rate', 'total_fees_btc', 'n_btc_mined',
-            'n_tx', 'n_blocks_mined', 'minutes_between_blocks', 'totalbc',
-            'n_blocks_total', 'estimated_transaction_volume_usd', 'blocks_size',
-            'miners_revenue_usd', 'nextretarget', 'difficulty', 'estimated_btc_sent',
-            'miners_revenue_btc', 'total_btc_sent', 'trade_volume_btc', 'trade_volume_usd',
-            'timestamp'
-        ]
+        return list(self.SCHEMA)
     
+    @timed_select
     def select(self, query) -> pd.DataFrame:
         """Get Bitcoin network statistics."""
-        # Get data from API using stats endpoint
-        response = self.handler.call_blockchain_api('/stats', {'format': 'json'})
-        
-        if response:
-            current_time = int(time.time())
-            row = [
-                response.get('market_price_usd'),
-                response.get('hash_rate'),
-                response.get('total_fees_btc'),
-                response.get('n_btc_mined'),
-                response.get('n_tx'),
-                response.get('n_blocks_mined'),
-                response.get('minutes_between_blocks'),
-                response.get('totalbc'),
-                response.get('n_blocks_total'),
-                response.get('estimated_transaction_volume_usd'),
-                response.get('blocks_size'),
-                response.get('miners_revenue_usd'),
-                response.get('nextretarget'),
-                response.get('difficulty'),
-                response.get('estimated_btc_sent'),
-                response.get('miners_revenue_btc'),
-                response.get('total_btc_sent'),
-                response.get('trade_volume_btc'),
-                response.get('trade_volume_usd'),
-                current_time
-            ]
-            return pd.DataFrame([row], columns=self.get_columns())
+        history = self.handler.stats_history
+        poller = self.handler.start_stats_poller()
         
-        return pd.DataFrame(columns=self.get_columns())
+        # The poller keeps a recent sample at hand, otherwise fall back to the stats endpoint
+        if poller is None or not history.is_fresh(2 * poller.interval):
+            response = self.handler.call_blockchain_api('/stats', {'format': 'json'})
+            if response:
+                history.append(response, self.handler.tip_height)
+        
+        # Rows are stamped with the time of the sample, as reported by the API
+        if history.latest is not None:
+            return build_frame([history.latest], self.SCHEMA)
+        
+        return empty_frame(self.SCHEMA)
+
+
+class StatsHistoryTable(APITable):
+    """Table for the /stats samples recorded by the handler, oldest first."""
+    
+    SCHEMA = {'timestamp': INT, 'block_height': INT, **STATS_SCHEMA}
+    
+    def get_columns(self) -> List[str]:
+        return list(self.SCHEMA)
+    
+    @timed_select
+    def select(self, query) -> pd.DataFrame:
+        """Get the recorded history of Bitcoin network statistics."""
+        conditions = extract_comparison_conditions(query.where)
+        pushdown = QueryPushdown(query, self.get_columns())
+        self.handler.start_stats_poller()
+        
+        data = self.handler.stats_history.columns(*_range_bounds(conditions, 'timestamp'))
+        # Heights unknown at sampling time are stored as -1
+        block_height = pd.array(data['block_height'], dtype='Int64')
+        block_height[data['block_height'] < 0] = pd.NA
+        data['block_height'] = block_height
+        return pushdown.apply(typed_frame(data, self.SCHEMA))
 
 
 class UnconfirmedTransactionsTable(APITable):
     """Table for unconfirmed Bitcoin transactions."""
     
+    # Fields of the mempool index entries where they differ from the column name
+    SOURCES = {'total_input_value': 'total_input', 'total_output_value': 'total_output'}
+    
+    # ORDER BY columns that can be read from an index entry for top-N selection
+    SORT_KEYS = {
+        'fee': lambda tx: tx.get('fee') or 0,
+        'size': lambda tx: tx.get('size') or 0,
+        'time': lambda tx: tx.get('time') or 0
+    }
+    
+    SCHEMA = {
+        'hash': STRING, 'size': INT, 'time': INT, 'fee': INT, 'inputs_count': INT, 'outputs_count': INT,
+        'total_input_value': INT, 'total_output_value': INT, 'fee_per_byte': FLOAT
+    }
+    
     def get_columns(self) -> List[str]:
-        return [
-            'hash', 'size', 'time', 'fee', 'inputs_count', 'outputs_count',
-            'total_input_value', 'total_output_value', 'fee_per_byte'
-        ]
+        return list(self.SCHEMA)
     
+    @timed_select
     def select(self, query) -> pd.DataFrame:
         """Get unconfirmed Bitcoin transactions."""
-        response = self.handler.call_blockchain_api('/unconfirmed-transactions', {'format': 'json'})
+        pushdown = QueryPushdown(query, self.get_columns())
+        mempool = self.handler.refresh_mempool()
         
-        if response and 'txs' in response:
-            rows = []
-            for tx in response['txs']:
-                inputs = tx.get('inputs', [])
-                outputs = tx.get('out', [])
-                
-                total_input = sum(float(inp.get('prev_out', {}).get('value', 0)) for inp in inputs if inp.get('prev_out'))
-                total_output = sum(float(out.get('value', 0)) for out in outputs)
-                
-                fee = tx.get('fee', 0)
-                size = tx.get('size', 1)
-                fee_per_byte = fee / size if size > 0 else 0
-                
-                rows.append([
-                    tx.get('hash'),
-                    tx.get('size'),
-                    tx.get('time'),
-                    fee,
-                    len(inputs),
-                    len(outputs),
-                    total_input,
-                    total_output,
-                    fee_per_byte
-                ])
-            return pd.DataFrame(rows, columns=self.get_columns())
-        
-        return pd.DataFrame(columns=self.get_columns()) 
\ No newline at end of file
+        with mempool.lock:
+            ascending = pushdown.ordered_by('fee_per_byte')
+            if ascending is not None:
+                # Served straight from the fee rate sorted index
+                txs = mempool.top_by_fee_rate(pushdown.limit, descending=not ascending)
+            else:
+                txs = mempool.transactions()
+        
+        if ascending is None:
+            selected = pushdown.top_n(txs, self.SORT_KEYS)
+            if selected is None:
+                selected = txs if pushdown.order_by else txs[:pushdown.limit]
+            txs = selected
+        
+        return pushdown.apply(build_frame(txs, self.SCHEMA, self.SOURCES))
+
+
+class MempoolFeeHistogramTable(APITable):
+    """Table for the fee rate histogram of the mempool index."""
+    
+    SCHEMA = {
+        'min_fee_per_byte': FLOAT, 'max_fee_per_byte': FLOAT, 'tx_count': INT, 'total_size': INT, 'total_fee': INT
+    }
+    
+    def get_columns(self) -> List[str]:
+        return list(self.SCHEMA)
+    
+    @timed_select
+    def select(self, query) -> pd.DataFrame:
+        """Get the fee rate histogram of unconfirmed transactions."""
+        pushdown = QueryPushdown(query, self.get_columns())
+        mempool = self.handler.refresh_mempool()
+        
+        with mempool.lock:
+            histogram = mempool.histogram()
+        return pushdown.apply(typed_frame(histogram, self.SCHEMA))
+
+
+class HandlerMetricsTable(APITable):
+    """Table for the latency, size, retry and cache metrics of the handler itself."""
+    
+    SCHEMA = {
+        'scope': CATEGORY, 'name': CATEGORY, 'metric': CATEGORY, 'count': INT,
+        'total': FLOAT, 'mean': FLOAT, 'p50': FLOAT, 'p90': FLOAT, 'p99': FLOAT, 'max': FLOAT
+    }
+    
+    def get_columns(self) -> List[str]:
+        return list(self.SCHEMA)
+    
+    def select(self, query) -> pd.DataFrame:
+        """Get the metrics recorded since the handler was created."""
+        conditions = extract_comparison_conditions(query.where)
+        pushdown = QueryPushdown(query, self.get_columns())
+        
+        rows = self.handler.metrics.rows()
+        for op, arg1, arg2 in conditions:
+            if arg1 in ('scope', 'name', 'metric'):
+                op = op.lower()
+                if op == '=':
+                    rows = [row for row in rows if row[arg1] == arg2]
+                elif op == 'in':
+                    values = set(arg2 if isinstance(arg2, list) else [arg2])
+                    rows = [row for row in rows if row[arg1] in values]
+        
+        return pushdown.apply(build_frame(rows, self.SCHEMA))
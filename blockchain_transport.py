@@ -0,0 +1,386 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from mindsdb.utilities import log
+
+from .blockchain_deadline import check_deadline, current_deadline
+from .blockchain_metrics import HandlerMetrics
+
+logger = log.getLogger(__name__)
+
+# Status codes that are worth retrying: throttling and transient server errors
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# States of a CircuitBreaker
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request while the circuit breaker of its API host is open."""
+
+
+def backoff_delay(attempt: int, backoff_factor: float, max_backoff: float) -> float:
+    """Exponential backoff with full jitter, which keeps concurrent workers from retrying in lockstep."""
+    return random.uniform(0, min(max_backoff, backoff_factor * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait according to a Retry-After header, given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucketRateLimiter:
+    """
+    Thread-safe token bucket shared by all requests of a handler.
+
+    The refill rate adapts to the upstream API: it is halved whenever a 429 is
+    received and recovers additively on every successful response.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Args:
+            rate (float): Sustained requests per second
+            burst (int): Maximum number of requests that can be sent back to back
+        """
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = self.max_rate / 16
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_refill
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def try_acquire(self) -> float:
+        """
+        Take a token if one is available, without blocking.
+
+        Returns:
+            0 if a token was taken, otherwise seconds to wait before trying again
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Block until a token is available.
+
+        Args:
+            timeout (float): Maximum seconds to wait, None to wait as long as needed
+
+        Returns:
+            Seconds spent waiting, or None if no token became available within the timeout
+        """
+        waited = 0.0
+        delay = self.try_acquire()
+        while delay > 0:
+            if timeout is not None and waited + delay > timeout:
+                return None
+            time.sleep(delay)
+            waited += delay
+            delay = self.try_acquire()
+        return waited
+
+    def penalize(self, retry_after: Optional[float] = None) -> None:
+        """Back off after the API signalled throttling."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+    def reward(self) -> None:
+        """Recover part of the configured rate after a successful request."""
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker of one API host.
+
+    Opens after failure_threshold consecutive failures (connection errors, timeouts and 5xx
+    responses), so that requests fail fast instead of tying up threads while the API is down.
+    After reset_timeout seconds it half-opens and lets a single probe request through, which
+    closes the circuit on success and opens it again on failure.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 metrics: Optional[HandlerMetrics] = None):
+        """
+        Args:
+            name (str): Name of the circuit in metrics and messages, e.g. the base URL
+            failure_threshold (int): Consecutive failures that open the circuit
+            reset_timeout (float): Seconds the circuit stays open before a probe is let through
+            metrics (HandlerMetrics): Optional metrics recording state changes and rejected requests
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.metrics = metrics
+        self.state = CLOSED
+        self.failures = 0
+        self.last_success: Optional[float] = None
+
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a probe through."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    @property
+    def is_open(self) -> bool:
+        """Whether requests are currently rejected."""
+        return self.state == OPEN and self.retry_in() > 0
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; a half-open circuit admits one probe at a time."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and now < self._opened_at + self.reset_timeout:
+                allowed = False
+            elif self._probe_started is None or now - self._probe_started > self.reset_timeout:
+                # Also replaces a probe that never reported back
+                self._set_state(HALF_OPEN)
+                self._probe_started = now
+                allowed = True
+            else:
+                allowed = False
+        if not allowed and self.metrics is not None:
+            self.metrics.observe('circuit_breaker', self.name, 'rejected')
+        return allowed
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.last_success = time.monotonic()
+            self.failures = 0
+            self._probe_started = None
+            if self.state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probe_started = None
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                if self.state != OPEN:
+                    self._set_state(OPEN)
+
+    def _set_state(self, state: str) -> None:
+        if state == OPEN:
+            logger.warning(f"Circuit for {self.name} opened after {self.failures} failures, "
+                           f"failing fast for {self.reset_timeout:g}s")
+        elif state == CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self.state = state
+        if self.metrics is not None:
+            self.metrics.observe('circuit_breaker', self.name, state)
+
+
+class BlockchainTransport:
+    """
+    HTTP transport for the Blockchain.com APIs.
+
+    Owns one pooled keep-alive session and circuit breaker per base URL, applies connect/read
+    timeouts, rate limits outgoing requests and retries throttled or failed requests with
+    jittered exponential backoff. Timeouts, waits and retries are cut short by the deadline of
+    the query being served, see blockchain_deadline.
+    """
+
+    def __init__(
+        self,
+        headers: Dict[str, str],
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        metrics: Optional[HandlerMetrics] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0
+    ):
+        self.headers = headers
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._sessions: Dict[str, requests.Session] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def _get_session(self, base_url: str) -> requests.Session:
+        session = self._sessions.get(base_url)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(base_url)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(self.headers)
+                # Retries are handled here so that Retry-After and the rate limiter are honored
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[base_url] = session
+        return session
+
+    def breaker(self, base_url: str) -> CircuitBreaker:
+        """Circuit breaker of an API host, shared with the async engine."""
+        breaker = self._breakers.get(base_url)
+        if breaker is not None:
+            return breaker
+
+        with self._lock:
+            breaker = self._breakers.get(base_url)
+            if breaker is None:
+                breaker = CircuitBreaker(base_url, self.failure_threshold, self.reset_timeout, self.metrics)
+                self._breakers[base_url] = breaker
+        return breaker
+
+    def _backoff(self, attempt: int) -> float:
+        return backoff_delay(attempt, self.backoff_factor, self.max_backoff)
+
+    def _timeout(self, stream: bool) -> Tuple[float, float]:
+        # Connect and read timeouts, capped by the remaining budget of the query. The read timeout
+        # of a streamed response also applies to reading its body, which the caller paces itself.
+        deadline = current_deadline()
+        if deadline is None:
+            return self.timeout
+        remaining = max(deadline.remaining(), 0.01)
+        return min(self.timeout[0], remaining), self.timeout[1] if stream else min(self.timeout[1], remaining)
+
+    def get(self, base_url: str, endpoint: str, params: Optional[Dict] = None, stream: bool = False) -> requests.Response:
+        """
+        Send a GET request, retrying on throttling, transient errors and timeouts.
+
+        Args:
+            base_url (str): Scheme and host of the API
+            endpoint (str): API endpoint path
+            params (dict): Optional query parameters
+            stream (bool): Do not read the response body up front
+
+        Returns:
+            requests.Response with a successful status code
+        """
+        session = self._get_session(base_url)
+        breaker = self.breaker(base_url)
+        deadline = current_deadline()
+        url = base_url + endpoint
+
+        for attempt in range(self.max_retries + 1):
+            check_deadline(f'before requesting {endpoint}')
+            if not breaker.allow():
+                raise CircuitOpenError(
+                    f"Circuit for {base_url} is open after repeated failures, next attempt in {breaker.retry_in():.0f}s"
+                )
+
+            if self.rate_limiter is not None:
+                waited = self.rate_limiter.acquire(deadline.remaining() if deadline is not None else None)
+                if waited is None:
+                    deadline.fail(f'waiting for the rate limiter before requesting {endpoint}')
+                if self.metrics is not None:
+                    self.metrics.record_rate_limit_wait(waited)
+
+            try:
+                response = session.get(url, params=params, timeout=self._timeout(stream), stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if deadline is not None and deadline.expired:
+                    # The timeout was cut short by the budget, which says nothing about the API
+                    deadline.fail(f'requesting {endpoint}')
+                breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                if deadline is not None and delay >= deadline.remaining():
+                    # A retry that could only start after the deadline is not worth waiting for
+                    deadline.fail(f'retrying {endpoint}')
+                if self.metrics is not None:
+                    self.metrics.record_retry(endpoint, type(e).__name__)
+                logger.warning(f"Request to {endpoint} failed ({e}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+
+            # Throttling and client errors still show that the API is up
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                delay = min(delay, self.max_backoff)
+                if response.status_code == 429 and self.rate_limiter is not None:
+                    self.rate_limiter.penalize(delay)
+                if deadline is not None and delay >= deadline.remaining():
+                    response.close()
+                    deadline.fail(f'retrying {endpoint}')
+                if self.metrics is not None:
+                    self.metrics.record_retry(endpoint, str(response.status_code))
+                logger.warning(f"Request to {endpoint} returned {response.status_code}, retrying in {delay:.2f}s")
+                response.close()
+                time.sleep(delay)
+                continue
+
+            response.raise_for_status()
+            if self.rate_limiter is not None:
+                self.rate_limiter.reward()
+            return response
+
+        # Unreachable: the last attempt either returns or raises
+        raise requests.exceptions.RetryError(f"Retries exhausted for {url}")
+
+    def close(self) -> None:
+        """Close all pooled sessions."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
@@ -4,14 +4,201 @@ connection_args = {
         'description': 'Blockchain.com API base URL',
         'default': 'https://blockchain.info'
     },
+    'charts_base_url': {
+        'type': 'str',
+        'description': 'Blockchain.com charts API base URL',
+        'default': 'https://api.blockchain.info'
+    },
     'cors': {
         'type': 'bool',
         'description': 'Enable CORS headers',
         'default': True
+    },
+    'connect_timeout': {
+        'type': 'float',
+        'description': 'Seconds to wait for a connection to the API to be established',
+        'default': 5.0
+    },
+    'read_timeout': {
+        'type': 'float',
+        'description': 'Seconds to wait for the API to send a response',
+        'default': 30.0
+    },
+    'pool_size': {
+        'type': 'int',
+        'description': 'Maximum number of pooled keep-alive connections per API host',
+        'default': 10
+    },
+    'rate_limit': {
+        'type': 'float',
+        'description': 'Maximum sustained requests per second sent to the API (0 disables rate limiting)',
+        'default': 5.0
+    },
+    'rate_limit_burst': {
+        'type': 'int',
+        'description': 'Maximum number of requests that may be sent in a burst',
+        'default': 10
+    },
+    'max_retries': {
+        'type': 'int',
+        'description': 'Number of retries for throttled (429), failed (5xx) or timed out requests',
+        'default': 3
+    },
+    'circuit_failure_threshold': {
+        'type': 'int',
+        'description': 'Consecutive failed requests to an API host after which requests to it fail fast',
+        'default': 5
+    },
+    'circuit_reset_timeout': {
+        'type': 'float',
+        'description': 'Seconds requests fail fast before a probe request is sent to the API host again',
+        'default': 30
+    },
+    'query_timeout': {
+        'type': 'float',
+        'description': 'Time budget of a query in seconds, after which partial results are returned (0 disables it)',
+        'default': 60
+    },
+    'health_check_ttl': {
+        'type': 'float',
+        'description': 'Seconds a successful response or connection check is trusted before checking the API again',
+        'default': 30
+    },
+    'backoff_factor': {
+        'type': 'float',
+        'description': 'Base delay in seconds for jittered exponential backoff between retries',
+        'default': 0.5
+    },
+    'cache_size_mb': {
+        'type': 'float',
+        'description': 'Byte budget of the in-process response cache in MB (0 disables caching)',
+        'default': 64
+    },
+    'disk_cache_path': {
+        'type': 'str',
+        'description': 'SQLite file of the disk cache of immutable responses, shared by all processes on the host; the disk cache is disabled if not set',
+        'default': None
+    },
+    'disk_cache_size_mb': {
+        'type': 'float',
+        'description': 'Byte budget of the compressed responses in the disk cache in MB',
+        'default': 1024
+    },
+    'cache_near_tip_ttl': {
+        'type': 'float',
+        'description': 'Seconds to cache near-tip data such as /latestblock, /stats and unconfirmed transactions',
+        'default': 10
+    },
+    'cache_daily_ttl': {
+        'type': 'float',
+        'description': 'Seconds to cache chart series, which are updated daily',
+        'default': 3600
+    },
+    'cache_confirmations': {
+        'type': 'int',
+        'description': 'Confirmations after which blocks and transactions are cached as immutable',
+        'default': 6
+    },
+    'max_workers': {
+        'type': 'int',
+        'description': 'Maximum number of concurrent API calls for range and list queries',
+        'default': 8
+    },
+    'async_engine': {
+        'type': 'bool',
+        'description': 'Run range and list queries on an asyncio engine instead of the worker pool (requires aiohttp)',
+        'default': True
+    },
+    'async_concurrency': {
+        'type': 'int',
+        'description': 'Maximum number of API calls in flight on the asyncio engine',
+        'default': 32
+    },
+    'max_block_range': {
+        'type': 'int',
+        'description': 'Maximum number of blocks a single height range query may fetch',
+        'default': 10000
+    },
+    'max_time_range_days': {
+        'type': 'int',
+        'description': 'Maximum number of days a single time range query of blocks may scan',
+        'default': 366
+    },
+    'charts_refresh_interval': {
+        'type': 'float',
+        'description': 'Seconds after which locally stored chart series fetch their newer points',
+        'default': 300
+    },
+    'mempool_refresh_interval': {
+        'type': 'float',
+        'description': 'Seconds after which the mempool index merges a new unconfirmed transactions snapshot',
+        'default': 10
+    },
+    'mempool_max_age': {
+        'type': 'float',
+        'description': 'Seconds after which unconfirmed transactions are evicted from the mempool index',
+        'default': 10800
+    },
+    'block_tx_chunk_size': {
+        'type': 'int',
+        'description': 'Rows per chunk when the transactions of blocks are decoded incrementally',
+        'default': 1000
+    },
+    'stats_poll_interval': {
+        'type': 'float',
+        'description': 'Seconds between background samples of /stats and /latestblock; 0 disables the poller',
+        'default': 0
+    },
+    'stats_history_size': {
+        'type': 'int',
+        'description': 'Number of /stats samples kept for the stats_history table',
+        'default': 8640
+    },
+    'address_page_size': {
+        'type': 'int',
+        'description': 'Number of transactions fetched per /rawaddr page for address_transactions',
+        'default': 50
+    },
+    'multiaddr_chunk_size': {
+        'type': 'int',
+        'description': 'Maximum number of addresses per /multiaddr call when querying address lists',
+        'default': 100
+    },
+    'address_fill_unredeemed': {
+        'type': 'bool',
+        'description': 'Fill n_unredeemed of address lists with one /rawaddr call per address',
+        'default': False
+    },
+    'header_index_path': {
+        'type': 'str',
+        'description': 'File of the local block header index; the index is disabled if not set',
+        'default': None
+    },
+    'header_sync_interval': {
+        'type': 'float',
+        'description': 'Minimum seconds between syncs of the header index with the chain tip',
+        'default': 30
+    },
+    'header_sync_depth': {
+        'type': 'int',
+        'description': 'Maximum number of blocks below the tip the header index syncs',
+        'default': 144
+    },
+    'materialize_path': {
+        'type': 'str',
+        'description': 'Directory of the materialized height ranges of blocks and block_transactions, requires pyarrow; materialization is disabled if not set',
+        'default': None
+    },
+    'materialize_partition_blocks': {
+        'type': 'int',
+        'description': 'Heights per materialized partition file',
+        'default': 1000
     }
 }
 
 connection_args_example = {
     'base_url': 'https://blockchain.info',
-    'cors': True
-} 
\ No newline at end of file
+    'cors': True,
+    'read_timeout': 30.0,
+    'rate_limit': 5.0
+}